@@ -0,0 +1,40 @@
+"""Add cluster keywords
+
+Revision ID: 0a0bf10d8113
+Revises: f56f381b8d14
+Create Date: 2026-10-17 21:36:08.512734
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0a0bf10d8113'
+down_revision: Union[str, Sequence[str], None] = 'f56f381b8d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cluster_keywords',
+    sa.Column('cluster_id', sa.Integer(), nullable=False),
+    sa.Column('keyword', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['cluster_id'], ['document_clusters.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cluster_id', 'keyword')
+    )
+    op.create_index('ix_cluster_keywords_owner_id_keyword', 'cluster_keywords', ['owner_id', 'keyword'], unique=False)
+    # Clusters are fitted again on next request, filling the new table
+    op.execute("DELETE FROM cluster_models")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cluster_keywords_owner_id_keyword', table_name='cluster_keywords')
+    op.drop_table('cluster_keywords')
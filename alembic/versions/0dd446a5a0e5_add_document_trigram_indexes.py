@@ -0,0 +1,35 @@
+"""Add document trigram indexes
+
+Revision ID: 0dd446a5a0e5
+Revises: 01f523ce2068
+Create Date: 2026-10-17 14:40:12.907331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0dd446a5a0e5'
+down_revision: Union[str, Sequence[str], None] = '01f523ce2068'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_documents_title_trgm', 'documents', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_documents_content_trgm', 'documents', ['content'], unique=False,
+        postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_content_trgm', table_name='documents')
+    op.drop_index('ix_documents_title_trgm', table_name='documents')
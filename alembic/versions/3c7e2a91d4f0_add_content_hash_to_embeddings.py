@@ -0,0 +1,53 @@
+"""Add content_hash to embeddings
+
+Revision ID: 3c7e2a91d4f0
+Revises: 6ae527c53f18
+Create Date: 2026-10-17 10:12:31.415926
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e2a91d4f0'
+down_revision: Union[str, Sequence[str], None] = '6ae527c53f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'embeddings',
+        sa.Column('content_hash', sa.String(length=64), nullable=True)
+    )
+    op.create_index(
+        op.f('ix_embeddings_owner_id'), 'embeddings', ['owner_id'], unique=False
+    )
+    op.create_index(
+        op.f('ix_embeddings_document_id'), 'embeddings', ['document_id'], unique=False
+    )
+    op.drop_constraint(
+        'embeddings_document_id_fkey', 'embeddings', type_='foreignkey'
+    )
+    op.create_foreign_key(
+        'embeddings_document_id_fkey', 'embeddings', 'documents',
+        ['document_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'embeddings_document_id_fkey', 'embeddings', type_='foreignkey'
+    )
+    op.create_foreign_key(
+        'embeddings_document_id_fkey', 'embeddings', 'documents',
+        ['document_id'], ['id']
+    )
+    op.drop_index(op.f('ix_embeddings_document_id'), table_name='embeddings')
+    op.drop_index(op.f('ix_embeddings_owner_id'), table_name='embeddings')
+    op.drop_column('embeddings', 'content_hash')
@@ -0,0 +1,41 @@
+"""Add document neighbors
+
+Revision ID: 4c275ae1db88
+Revises: fed2543eb068
+Create Date: 2026-10-17 17:31:09.482650
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4c275ae1db88'
+down_revision: Union[str, Sequence[str], None] = 'fed2543eb068'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_neighbors',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('neighbor_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['neighbor_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id', 'neighbor_id')
+    )
+    op.create_index(op.f('ix_document_neighbors_neighbor_id'), 'document_neighbors', ['neighbor_id'], unique=False)
+    op.create_index(op.f('ix_document_neighbors_owner_id'), 'document_neighbors', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_neighbors_owner_id'), table_name='document_neighbors')
+    op.drop_index(op.f('ix_document_neighbors_neighbor_id'), table_name='document_neighbors')
+    op.drop_table('document_neighbors')
@@ -0,0 +1,38 @@
+"""Add index operations
+
+Revision ID: 7d3e52b1c0a4
+Revises: 0a0bf10d8113
+Create Date: 2026-10-17 23:12:41.306518
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3e52b1c0a4'
+down_revision: Union[str, Sequence[str], None] = '0a0bf10d8113'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('index_operations',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=16), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('queued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+    op.create_index(op.f('ix_index_operations_owner_id'), 'index_operations', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_index_operations_owner_id'), table_name='index_operations')
+    op.drop_table('index_operations')
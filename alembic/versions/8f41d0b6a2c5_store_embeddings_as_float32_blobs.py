@@ -0,0 +1,73 @@
+"""Store embeddings as float32 blobs
+
+Revision ID: 8f41d0b6a2c5
+Revises: 3c7e2a91d4f0
+Create Date: 2026-10-17 11:04:52.271828
+
+"""
+from typing import Sequence, Union
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41d0b6a2c5'
+down_revision: Union[str, Sequence[str], None] = '3c7e2a91d4f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VECTOR_DTYPE = np.dtype("<f4")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('embeddings', sa.Column('vector', sa.LargeBinary(), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT id, embedding_vector FROM embeddings")
+    ).fetchall()
+    for row in rows:
+        connection.execute(
+            sa.text("UPDATE embeddings SET vector = :vector WHERE id = :id"),
+            {
+                "id": row.id,
+                "vector": np.asarray(
+                    row.embedding_vector, dtype=VECTOR_DTYPE
+                ).tobytes()
+            }
+        )
+
+    op.alter_column('embeddings', 'vector', nullable=False)
+    op.drop_column('embeddings', 'embedding_vector')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        'embeddings',
+        sa.Column(
+            'embedding_vector',
+            postgresql.ARRAY(sa.Float()),
+            nullable=True
+        )
+    )
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT id, vector FROM embeddings")
+    ).fetchall()
+    for row in rows:
+        connection.execute(
+            sa.text("UPDATE embeddings SET embedding_vector = :vector WHERE id = :id"),
+            {
+                "id": row.id,
+                "vector": np.frombuffer(row.vector, dtype=VECTOR_DTYPE).tolist()
+            }
+        )
+
+    op.alter_column('embeddings', 'embedding_vector', nullable=False)
+    op.drop_column('embeddings', 'vector')
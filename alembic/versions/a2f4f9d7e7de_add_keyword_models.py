@@ -0,0 +1,43 @@
+"""Add keyword models
+
+Revision ID: a2f4f9d7e7de
+Revises: eeb045a31685
+Create Date: 2026-10-17 16:05:52.774013
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2f4f9d7e7de'
+down_revision: Union[str, Sequence[str], None] = 'eeb045a31685'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('keyword_models',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.Column('fitted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+    op.create_table('term_frequencies',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id', 'term')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('term_frequencies')
+    op.drop_table('keyword_models')
@@ -0,0 +1,29 @@
+"""Add document keyset pagination index
+
+Revision ID: eeb045a31685
+Revises: 0dd446a5a0e5
+Create Date: 2026-10-17 15:18:36.540192
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'eeb045a31685'
+down_revision: Union[str, Sequence[str], None] = '0dd446a5a0e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_documents_owner_id_created_at_id', 'documents',
+        ['owner_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_owner_id_created_at_id', table_name='documents')
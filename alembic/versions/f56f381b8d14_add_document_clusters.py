@@ -0,0 +1,65 @@
+"""Add document clusters
+
+Revision ID: f56f381b8d14
+Revises: 4c275ae1db88
+Create Date: 2026-10-17 18:12:44.205391
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f56f381b8d14'
+down_revision: Union[str, Sequence[str], None] = '4c275ae1db88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cluster_models',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('num_clusters', sa.Integer(), nullable=False),
+    sa.Column('fitted_documents', sa.Integer(), nullable=False),
+    sa.Column('assigned_documents', sa.Integer(), nullable=False),
+    sa.Column('fitted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+    op.create_table('document_clusters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('centroid', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_document_clusters_id'), 'document_clusters', ['id'], unique=False)
+    op.create_index(op.f('ix_document_clusters_owner_id'), 'document_clusters', ['owner_id'], unique=False)
+    op.create_table('document_cluster_assignments',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('cluster_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['cluster_id'], ['document_clusters.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+    op.create_index(op.f('ix_document_cluster_assignments_cluster_id'), 'document_cluster_assignments', ['cluster_id'], unique=False)
+    op.create_index(op.f('ix_document_cluster_assignments_owner_id'), 'document_cluster_assignments', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_cluster_assignments_owner_id'), table_name='document_cluster_assignments')
+    op.drop_index(op.f('ix_document_cluster_assignments_cluster_id'), table_name='document_cluster_assignments')
+    op.drop_table('document_cluster_assignments')
+    op.drop_index(op.f('ix_document_clusters_owner_id'), table_name='document_clusters')
+    op.drop_index(op.f('ix_document_clusters_id'), table_name='document_clusters')
+    op.drop_table('document_clusters')
+    op.drop_table('cluster_models')
@@ -0,0 +1,45 @@
+"""Add document keywords
+
+Revision ID: fed2543eb068
+Revises: a2f4f9d7e7de
+Create Date: 2026-10-17 16:48:20.119467
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'fed2543eb068'
+down_revision: Union[str, Sequence[str], None] = 'a2f4f9d7e7de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_keywords',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('keyword', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('document_id', 'keyword')
+    )
+    op.create_index(
+        'ix_document_keywords_owner_id_keyword', 'document_keywords',
+        ['owner_id', 'keyword'], unique=False
+    )
+    # Keywords are indexed when the keyword model of a user is fitted again
+    op.execute("DELETE FROM keyword_models")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_document_keywords_owner_id_keyword', table_name='document_keywords'
+    )
+    op.drop_table('document_keywords')
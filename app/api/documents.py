@@ -7,24 +7,31 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
     Request,
+    Response,
     UploadFile,
     status,
 )
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
 from app.core.file_utils import delete_file, save_upload_file
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor
 from app.crud.document import crud_document
 from app.models.user import User
 from app.schemas.document import (
     DocumentCreate,
     DocumentResponse,
+    DocumentSummary,
     DocumentUpdate,
     NoteCreate,
 )
 from app.services.ai_service import ai_service
+from app.services.inference import inference_executor
+from app.services.keyword_service import keyword_service
 from app.services.text_extraction import text_extraction_service
 
 logger = logging.getLogger(__name__)
@@ -33,13 +40,79 @@ router = APIRouter()
 
 @router.get("/", response_model=List[DocumentResponse])
 def get_documents(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all documents for current user"""
-    return crud_document.get_all_by_owner(db, current_user.id, skip, limit)
+    """Get documents of current user, newest first
+
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        documents, next_cursor = crud_document.get_all_by_owner(
+            db,
+            current_user.id,
+            cursor,
+            limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return documents
+
+
+@router.get(
+    "/summaries",
+    response_model=List[DocumentSummary],
+    response_model_exclude_unset=True
+)
+def get_document_summaries(
+    response: Response,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated fields to return, all summary fields if empty"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List documents of current user without loading their content
+
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    """
+    selected = list(DocumentSummary.model_fields)
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(requested) - set(selected)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        selected = ["id"] + [name for name in requested if name != "id"]
+
+    try:
+        documents, next_cursor = crud_document.get_all_by_owner(
+            db,
+            current_user.id,
+            cursor,
+            limit,
+            fields=selected
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [
+        DocumentSummary(**{name: getattr(doc, name) for name in selected})
+        for doc in documents
+    ]
 
 
 @router.get("/{doc_id}", response_model=DocumentResponse)
@@ -70,7 +143,7 @@ def create_document_endpoint(
     # Auto summarize if content is long
     if document.content and len(document.content) > 500:
         try:
-            ai_service.summarize_text(document.content)
+            inference_executor.call(ai_service.summarize_text, document.content)
             logger.info(f"Generated summary for document {document.id}")
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
@@ -104,10 +177,7 @@ async def upload_document(
         keywords = []
 
         if auto_summarize and final_content:
-            summary = ai_service.summarize_text(final_content)
-
-        if extract_keywords_enabled and final_content:
-            keywords = ai_service.extract_keywords(final_content)
+            summary = await ai_service.summarize_text_async(final_content)
 
         # Use filename as title if not provided
         document_title = title or file.filename
@@ -125,6 +195,15 @@ async def upload_document(
             file_meta
         )
 
+        # Scoring reads corpus statistics, so it runs off the event loop
+        if extract_keywords_enabled and final_content:
+            keywords = await run_in_threadpool(
+                keyword_service.extract,
+                db,
+                current_user.id,
+                final_content
+            )
+
         # Log AI results
         if summary or keywords:
             logger.info(
@@ -166,8 +245,11 @@ def analyze_document(
 
     try:
         # Generate AI analysis
-        summary = ai_service.summarize_text(document.content)
-        keywords = ai_service.extract_keywords(document.content)
+        summary = inference_executor.call(
+            ai_service.summarize_text,
+            document.content
+        )
+        keywords = keyword_service.extract(db, current_user.id, document.content)
         categories = ai_service.categorize_document(document.content)
 
         return {
@@ -312,7 +394,12 @@ async def create_note_endpoint(
     # Extract keywords if requested
     if note_data.extract_keywords and note_data.content:
         try:
-            keywords = ai_service.extract_keywords(note_data.content)
+            keywords = await run_in_threadpool(
+                keyword_service.extract,
+                db,
+                current_user.id,
+                note_data.content
+            )
             logger.info(f"Extracted keywords for note {document.id}: {keywords}")
         except Exception as e:
             logger.error(f"Error extracting keywords: {e}")
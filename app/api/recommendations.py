@@ -1,12 +1,19 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from app.crud.cluster import crud_cluster
+from app.crud.neighbor import crud_neighbor
 from app.models.document import Document
 from app.models.user import User
-from app.services.ai_service import ai_service
+from app.services.cluster_service import cluster_service
+from app.services.keyword_service import keyword_service
 
 router = APIRouter()
 
@@ -19,7 +26,7 @@ def get_similar_documents(
     current_user: User = Depends(get_current_user)
 ):
     """Get similar documents"""
-    target_document = db.query(Document).filter(
+    target_document = db.query(Document.id, Document.title).filter(
         Document.id == document_id,
         Document.owner_id == current_user.id
     ).first()
@@ -27,70 +34,134 @@ def get_similar_documents(
     if not target_document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Get all user documents (except target)
-    all_documents = db.query(Document).filter(
-        Document.owner_id == current_user.id,
-        Document.id != document_id
+    # Neighbours are materialized when the semantic index is built, until
+    # then candidates come from the keyword postings
+    source = "embeddings"
+    scores = crud_neighbor.get_neighbors(db, document_id, top_k)
+    if not scores:
+        source = "keywords"
+        scores = keyword_service.find_similar(
+            db,
+            current_user.id,
+            document_id,
+            top_k
+        )
+    documents = db.query(
+        Document.id,
+        Document.title,
+        Document.file_type
+    ).filter(
+        Document.id.in_([doc_id for doc_id, _ in scores]),
+        Document.owner_id == current_user.id
     ).all()
+    document_map = {doc.id: doc for doc in documents}
 
-    # Convert to dicts for processing
-    documents_data = [
+    similar_docs = [
         {
-            "id": doc.id,
-            "title": doc.title,
-            "content": doc.content or "",
-            "file_type": doc.file_type
+            "id": doc_id,
+            "title": document_map[doc_id].title,
+            "similarity": similarity,
+            "file_type": document_map[doc_id].file_type
         }
-        for doc in all_documents
+        for doc_id, similarity in scores
+        if doc_id in document_map
     ]
 
-    # Find similar documents using AI service
-    target_text = target_document.content or target_document.title
-    similar_docs = ai_service.find_similar_documents(
-        target_text,
-        documents_data,
-        top_k
-    )
-
     return {
         "target_document": {
             "id": target_document.id,
             "title": target_document.title
         },
-        "similar_documents": similar_docs
+        "similar_documents": similar_docs,
+        "source": source
     }
 
 
 @router.get("/clusters")
 def get_document_clusters(
-    num_clusters: int = 3,
+    documents_per_cluster: int = Query(10, ge=0, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Cluster documents by topics"""
-    documents = db.query(Document).filter(
+    """Cluster documents by topics
+
+    Documents are clustered by their embeddings into CLUSTER_COUNT
+    clusters labelled with distinctive keywords. Clusters are fitted in
+    background, until the first fit finishes this returns 503. Outgrown
+    clusters keep being served while they are fitted again. Further pages
+    of a cluster come from its next_cursor.
+    """
+    model = crud_cluster.get_model(db, current_user.id)
+    if cluster_service.needs_fit(model):
+        cluster_service.enqueue_fit(current_user.id)
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Clusters are being fitted, retry later"
+        )
+
+    total_documents = db.query(func.count(Document.id)).filter(
         Document.owner_id == current_user.id
-    ).all()
+    ).scalar()
+    sizes = crud_cluster.get_sizes(db, current_user.id)
+
+    clusters = []
+    for cluster in crud_cluster.get_clusters(db, current_user.id):
+        documents, next_cursor = [], None
+        if documents_per_cluster:
+            documents, next_cursor = crud_cluster.get_documents(
+                db,
+                current_user.id,
+                cluster.id,
+                limit=documents_per_cluster
+            )
+        clusters.append({
+            "cluster_id": cluster.id,
+            "topic": cluster.topic,
+            "size": sizes.get(cluster.id, 0),
+            "documents": [_cluster_document(doc) for doc in documents],
+            "next_cursor": next_cursor
+        })
 
-    if not documents:
-        return {"clusters": []}
-
-    # Convert to dicts for processing
-    documents_data = [
-        {
-            "id": doc.id,
-            "title": doc.title,
-            "content": doc.content or "",
-            "file_type": doc.file_type,
-            "created_at": doc.created_at.isoformat()
-        }
-        for doc in documents
-    ]
+    return {
+        "total_documents": total_documents,
+        "clusters": clusters
+    }
 
-    # Cluster documents
-    clusters = ai_service.cluster_documents(documents_data, num_clusters)
 
+@router.get("/clusters/{cluster_id}/documents")
+def get_cluster_documents(
+    cluster_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get documents of a cluster, closest to its centroid first
+
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        documents, next_cursor = crud_cluster.get_documents(
+            db,
+            current_user.id,
+            cluster_id,
+            cursor,
+            limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [_cluster_document(doc) for doc in documents]
+
+
+def _cluster_document(doc: Document) -> dict:
     return {
-        "total_documents": len(documents),
-        "clusters": clusters
+        "id": doc.id,
+        "title": doc.title,
+        "file_type": doc.file_type,
+        "created_at": doc.created_at.isoformat() if doc.created_at else None
     }
@@ -1,11 +1,13 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, literal, text
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor, paginate
+from app.crud.document import crud_document
 from app.models.document import Document
 from app.models.user import User
 from app.schemas.document import DocumentResponse
@@ -15,51 +17,105 @@ router = APIRouter()
 
 @router.get("/", response_model=List[DocumentResponse])
 def search_documents(
+    response: Response,
     q: str = Query(..., description="Search query"),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Search by title and content"""
-
-    # Basic search with ILIKE for case-insensitive search
-    search_filter = or_(
-        Document.title.ilike(f"%{q}%"),
-        Document.content.ilike(f"%{q}%")
-    )
-
-    documents = db.query(Document).filter(
-        Document.owner_id == current_user.id,
-        search_filter
-    ).offset(skip).limit(limit).all()
-
+    """Full-text search by title and content ranked by relevance
+
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        documents, next_cursor = crud_document.search(
+            db,
+            current_user.id,
+            q,
+            cursor,
+            limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return documents
 
 
 @router.get("/advanced", response_model=List[DocumentResponse])
 def advanced_search(
+    response: Response,
+    q: Optional[str] = Query(None, description="Full-text search query"),
     title: Optional[str] = Query(None, description="Search in title"),
     content: Optional[str] = Query(None, description="Search in content"),
     file_type: Optional[str] = Query(None, description="Filter by file type"),
-    skip: int = 0,
-    limit: int = 100,
+    fuzzy: bool = Query(False, description="Typo-tolerant title/content match"),
+    similarity: float = Query(
+        0.3,
+        ge=0.0,
+        le=1.0,
+        description="Trigram similarity threshold of fuzzy matching"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Advanced search with filtering"""
+    """Advanced search with filtering
+
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    """
 
     query = db.query(Document).filter(Document.owner_id == current_user.id)
+    # Results are ordered by relevance if any, newest first otherwise
+    sort_keys = []
+
+    if q:
+        query = query.filter(crud_document.search_filter(q))
+        sort_keys.append(crud_document.search_rank(q))
+
+    if fuzzy and (title or content):
+        # The trigram operators read their thresholds from these settings,
+        # scoped to the current transaction
+        for setting in ("similarity_threshold", "word_similarity_threshold"):
+            db.execute(
+                text("SELECT set_config(:name, :value, true)"),
+                {"name": f"pg_trgm.{setting}", "value": str(similarity)}
+            )
 
     if title:
-        query = query.filter(Document.title.ilike(f"%{title}%"))
+        if fuzzy:
+            query = query.filter(Document.title.op("%")(title))
+            sort_keys.append(func.similarity(Document.title, title))
+        else:
+            query = query.filter(Document.title.ilike(f"%{title}%"))
 
     if content:
-        query = query.filter(Document.content.ilike(f"%{content}%"))
+        if fuzzy:
+            # Closest extent of content to the searched words
+            query = query.filter(literal(content).op("<%")(Document.content))
+            sort_keys.append(func.word_similarity(content, Document.content))
+        else:
+            query = query.filter(Document.content.ilike(f"%{content}%"))
 
     if file_type:
         query = query.filter(Document.file_type == file_type)
 
-    documents = query.offset(skip).limit(limit).all()
-
+    if not sort_keys:
+        sort_keys.append(Document.created_at)
+
+    try:
+        documents, next_cursor = paginate(
+            query,
+            [*sort_keys, Document.id],
+            cursor,
+            limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return documents
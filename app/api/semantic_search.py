@@ -1,55 +1,97 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
 from app.core.database import get_db
-from app.models.document import Document
+from app.crud.document import crud_document
 from app.models.user import User
-from app.schemas.document import DocumentResponse
-from app.services.embedding_service import embedding_service
+from app.schemas.document import (
+    DocumentResponse,
+    PassageMatch,
+    SemanticSearchResult,
+)
+from app.services.embedding_service import IndexBuildPending, embedding_service
 
 router = APIRouter()
 
 
-@router.get("/semantic", response_model=List[DocumentResponse])
-def semantic_search(
+@router.get("/semantic", response_model=List[SemanticSearchResult])
+async def semantic_search(
     q: str = Query(..., description="Semantic search query"),
     k: int = Query(10, description="Number of results"),
     threshold: float = Query(0.3, description="Similarity threshold"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Semantic search by meaning"""
+    """Semantic search by meaning
 
-    # Check and rebuild index if needed
-    if not embedding_service.load_index(current_user.id):
-        embedding_service.build_index_from_documents(db, current_user.id)
+    Database work runs in the threadpool and the query embedding is
+    awaited, so waiting on busy inference does not hold a thread.
+    """
+
+    # Get user index, building it if needed
+    try:
+        user_index = await run_in_threadpool(
+            embedding_service.get_user_index,
+            db,
+            current_user.id
+        )
+    except IndexBuildPending:
+        # Answer with keyword matches until the running build finishes
+        documents, _ = await run_in_threadpool(
+            crud_document.search,
+            db,
+            current_user.id,
+            q,
+            limit=k
+        )
+        return [
+            SemanticSearchResult(
+                **DocumentResponse.model_validate(doc).model_dump(),
+                score=0.0,
+                passages=[]
+            )
+            for doc in documents
+        ]
 
     # Perform semantic search
-    results = embedding_service.semantic_search(q, k)
+    results = await embedding_service.semantic_search_async(user_index, q, k)
 
     # Filter by similarity threshold and get documents
-    document_ids = [doc_id for doc_id, score in results if score >= threshold]
+    matches = [match for match in results if match.score >= threshold]
 
-    if not document_ids:
+    if not matches:
         return []
 
     # Get documents from database
-    documents = db.query(Document).filter(
-        Document.id.in_(document_ids),
-        Document.owner_id == current_user.id
-    ).all()
-
-    # Sort by relevance
+    documents = await run_in_threadpool(
+        crud_document.get_by_ids,
+        db,
+        [match.document_id for match in matches],
+        current_user.id
+    )
+
+    # Sort by relevance and attach matching passages
     document_map = {doc.id: doc for doc in documents}
-    sorted_documents = [
-        document_map[doc_id] for doc_id in document_ids if doc_id in document_map
+    return [
+        SemanticSearchResult(
+            **DocumentResponse.model_validate(
+                document_map[match.document_id]
+            ).model_dump(),
+            score=match.score,
+            passages=[
+                PassageMatch(start_offset=start, end_offset=end, score=score)
+                for start, end, score in match.passages
+                if score >= threshold
+            ]
+        )
+        for match in matches
+        if match.document_id in document_map
     ]
 
-    return sorted_documents
-
 
 @router.post("/rebuild-index")
 def rebuild_semantic_index(
@@ -67,8 +109,14 @@ def rebuild_semantic_index(
         )
 
 
+@router.get("/stats")
+def get_semantic_stats(current_user: User = Depends(get_current_user)):
+    """Get semantic search cache and query batching statistics"""
+    return embedding_service.get_stats()
+
+
 @router.get("/hybrid-search", response_model=List[DocumentResponse])
-def hybrid_search(
+async def hybrid_search(
     q: str = Query(..., description="Search query"),
     semantic_weight: float = Query(0.7, description="Weight for semantic search"),
     keyword_weight: float = Query(0.3, description="Weight for keyword search"),
@@ -78,33 +126,43 @@ def hybrid_search(
 ):
     """Hybrid search: combination of semantic and keyword"""
 
-    from sqlalchemy import or_
-
     # Semantic search
     semantic_results = []
     if semantic_weight > 0:
-        if not embedding_service.load_index(current_user.id):
-            embedding_service.build_index_from_documents(db, current_user.id)
-        semantic_results = embedding_service.semantic_search(q, limit * 2)
+        try:
+            user_index = await run_in_threadpool(
+                embedding_service.get_user_index,
+                db,
+                current_user.id
+            )
+        except IndexBuildPending:
+            # Keyword matches alone until the running build finishes
+            user_index = None
+        semantic_results = await embedding_service.semantic_search_async(
+            user_index,
+            q,
+            limit * 2
+        )
 
     # Keyword search
     keyword_docs = []
     if keyword_weight > 0:
-        search_filter = or_(
-            Document.title.ilike(f"%{q}%"),
-            Document.content.ilike(f"%{q}%")
+        keyword_docs, _ = await run_in_threadpool(
+            crud_document.search,
+            db,
+            current_user.id,
+            q,
+            limit=limit * 2
         )
-        keyword_docs = db.query(Document).filter(
-            Document.owner_id == current_user.id,
-            search_filter
-        ).limit(limit * 2).all()
 
     # Combine results
     scored_docs = {}
 
     # Add semantic results
-    for doc_id, score in semantic_results:
-        scored_docs[doc_id] = scored_docs.get(doc_id, 0) + score * semantic_weight
+    for match in semantic_results:
+        scored_docs[match.document_id] = (
+            scored_docs.get(match.document_id, 0) + match.score * semantic_weight
+        )
 
     # Add keyword results
     for doc in keyword_docs:
@@ -118,10 +176,12 @@ def hybrid_search(
     )[:limit]
 
     # Get documents
-    documents = db.query(Document).filter(
-        Document.id.in_(sorted_doc_ids),
-        Document.owner_id == current_user.id
-    ).all()
+    documents = await run_in_threadpool(
+        crud_document.get_by_ids,
+        db,
+        sorted_doc_ids,
+        current_user.id
+    )
 
     # Maintain order
     document_map = {doc.id: doc for doc in documents}
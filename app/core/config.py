@@ -19,5 +19,52 @@ class Settings:
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Semantic index cache settings
+    INDEX_CACHE_MAX_BYTES: int = int(
+        os.getenv("INDEX_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+    )
+
+    # Passage chunking settings (in characters)
+    CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1000"))
+    CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+    # ANN index selection settings
+    INDEX_FLAT_MAX_VECTORS: int = int(os.getenv("INDEX_FLAT_MAX_VECTORS", "20000"))
+    INDEX_HNSW_MAX_VECTORS: int = int(os.getenv("INDEX_HNSW_MAX_VECTORS", "500000"))
+    INDEX_RECALL_TARGET: float = float(os.getenv("INDEX_RECALL_TARGET", "0.95"))
+    # Share of deleted vectors an HNSW index may skip before it is rebuilt
+    INDEX_MAX_TOMBSTONE_RATIO: float = float(
+        os.getenv("INDEX_MAX_TOMBSTONE_RATIO", "0.2")
+    )
+
+    # Seconds a search waits for another request's index build before
+    # falling back to keyword search
+    INDEX_BUILD_WAIT_SECONDS: float = float(
+        os.getenv("INDEX_BUILD_WAIT_SECONDS", "30")
+    )
+
+    # Topic clusters kept per user, refitted when this changes
+    CLUSTER_COUNT: int = int(os.getenv("CLUSTER_COUNT", "3"))
+
+    # Query embedding cache settings
+    QUERY_CACHE_MAX_ENTRIES: int = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "10000"))
+    QUERY_CACHE_TTL_SECONDS: float = float(
+        os.getenv("QUERY_CACHE_TTL_SECONDS", "3600")
+    )
+
+    # Query encode micro-batching settings
+    QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
+    QUERY_BATCH_WAIT_MS: float = float(os.getenv("QUERY_BATCH_WAIT_MS", "5"))
+
+    # Model inference worker threads
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "2"))
+
+    # Embedding inference backend: torch, int8 or onnx (needs the onnx extra)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+
+    # Models loaded at startup before the worker reports ready:
+    # comma separated list of "embedding" and "summarizer"
+    PREWARM_MODELS: str = os.getenv("PREWARM_MODELS", "")
+
 
 settings = Settings()
@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
 from .config import settings
@@ -9,6 +13,13 @@ engine = create_engine(settings.DATABASE_URL)
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Seconds between attempts to take a busy advisory lock with a timeout
+ADVISORY_LOCK_POLL_SECONDS = 0.1
+
+
+class AdvisoryLockTimeout(TimeoutError):
+    """Advisory lock stayed held by another session for the whole timeout"""
+
 
 def get_db():
     """Dependency for getting database session"""
@@ -17,3 +28,50 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def advisory_lock(
+    namespace: int,
+    key: int,
+    timeout: Optional[float] = None
+) -> Iterator[bool]:
+    """Hold Postgres advisory lock across processes, waiting until it is free
+
+    Yields whether the lock was free right away. With a timeout, raises
+    AdvisoryLockTimeout instead of waiting longer. The lock lives on its
+    own connection, so commits of request sessions do not release it.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    params = {"namespace": namespace, "key": key}
+    with engine.connect() as connection:
+        try_lock = text("SELECT pg_try_advisory_lock(:namespace, :key)")
+        acquired = was_free = connection.execute(try_lock, params).scalar()
+        if not acquired and timeout is None:
+            connection.execute(
+                text("SELECT pg_advisory_lock(:namespace, :key)"),
+                params
+            )
+            acquired = True
+
+        deadline = time.monotonic() + (timeout or 0)
+        while not acquired:
+            if time.monotonic() >= deadline:
+                raise AdvisoryLockTimeout(
+                    f"Advisory lock ({namespace}, {key}) is busy"
+                )
+            time.sleep(ADVISORY_LOCK_POLL_SECONDS)
+            acquired = connection.execute(try_lock, params).scalar()
+        connection.commit()
+
+        try:
+            yield bool(was_free)
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:namespace, :key)"),
+                params
+            )
+            connection.commit()
@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Cursor was not issued by this API"""
+
+
+def keys_signature(keys: Sequence[Any]) -> str:
+    """Short digest of sort keys, ties a cursor to the listing that issued it"""
+    expressions = "|".join(str(key) for key in keys)
+    return hashlib.sha256(expressions.encode()).hexdigest()[:8]
+
+
+def encode_cursor(values: Sequence[Any], signature: str) -> str:
+    """Pack sort key values of last row and signature of keys into opaque token"""
+    packed = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps({"k": signature, "v": packed}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, signature: str) -> List[Any]:
+    """Unpack sort key values from token issued for keys of signature"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        token = json.loads(raw)
+        if token["k"] != signature:
+            raise ValueError("Cursor was issued for other sort keys")
+        packed = token["v"]
+        if not isinstance(packed, list):
+            raise TypeError("Cursor does not hold a list of values")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in packed
+        ]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def paginate(
+    query: Query,
+    keys: Sequence[Any],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """Get one page of query results in descending order of keys
+
+    Keys must end with a unique column so that the order is total. The
+    next page continues after the keys of the last row instead of skipping
+    an offset, so every page costs the same and rows added meanwhile do
+    not shift pages. A cursor only continues the listing of the same keys,
+    replaying it on another listing raises InvalidCursor.
+    """
+    signature = keys_signature(keys)
+    if cursor:
+        values = decode_cursor(cursor, signature)
+        if len(values) != len(keys):
+            raise InvalidCursor(f"Invalid cursor: {cursor}")
+        query = query.filter(tuple_(*keys) < tuple_(*values))
+
+    rows = query.add_columns(*keys).order_by(
+        *[key.desc() for key in keys]
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(list(rows[-1][1:]), signature)
+
+    return [row[0] for row in rows], next_cursor
@@ -0,0 +1,39 @@
+import logging
+import sys
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules that should only be imported when an ML feature is first used
+HEAVY_MODULES = ("torch", "faiss", "sentence_transformers", "transformers", "sklearn")
+
+
+class StartupReport:
+    """Time from application import to ready state"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_seconds: Optional[float] = None
+
+    def mark_ready(self):
+        """Record that the application finished start-up"""
+        self.ready_seconds = time.perf_counter() - self.started_at
+        report = self.as_dict()
+        logger.info(
+            f"Application ready in {self.ready_seconds:.3f}s, "
+            f"heavy modules loaded: {report['heavy_modules_loaded'] or 'none'}"
+        )
+
+    def as_dict(self) -> Dict:
+        """Get start-up report"""
+        return {
+            "ready_seconds": self.ready_seconds,
+            "heavy_modules_loaded": [
+                module for module in HEAVY_MODULES if module in sys.modules
+            ]
+        }
+
+
+# Created on first import, so app.main imports it before anything else
+startup_report = StartupReport()
@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.chunk import DocumentChunk
+from app.models.embedding import Embedding
+
+# Storage format of vectors in the embeddings table and of cluster centroids
+VECTOR_DTYPE = np.dtype("<f4")
+
+
+class CRUDChunk:
+    """CRUD operations for document chunks and their embeddings"""
+
+    def get_with_vectors(
+        self,
+        db: Session,
+        owner_id: int,
+        model_name: str,
+        document_ids: Optional[List[int]] = None
+    ) -> Tuple[List, np.ndarray]:
+        """Get chunk rows joined with their vectors in a single query
+
+        Returns the rows and their vectors decoded into one matrix, row i of
+        the matrix belongs to rows[i].
+        """
+        query = db.query(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.start_offset,
+            DocumentChunk.end_offset,
+            DocumentChunk.content_hash,
+            Embedding.vector
+        ).join(
+            Embedding,
+            Embedding.chunk_id == DocumentChunk.id
+        ).filter(
+            DocumentChunk.owner_id == owner_id,
+            Embedding.model_name == model_name
+        )
+
+        if document_ids is not None:
+            if not document_ids:
+                return [], np.empty((0, 0), dtype=VECTOR_DTYPE)
+            query = query.filter(DocumentChunk.document_id.in_(document_ids))
+
+        rows = query.order_by(
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index
+        ).all()
+        if not rows:
+            return rows, np.empty((0, 0), dtype=VECTOR_DTYPE)
+        return rows, np.frombuffer(
+            b"".join(row.vector for row in rows),
+            dtype=VECTOR_DTYPE
+        ).reshape(len(rows), -1)
+
+    def replace_for_document(
+        self,
+        db: Session,
+        owner_id: int,
+        document_id: int,
+        model_name: str,
+        records: List[Dict]
+    ) -> List[int]:
+        """Replace chunks of document and return IDs of the new chunks"""
+        self.delete_by_document(db, document_id)
+
+        chunks = [
+            DocumentChunk(
+                owner_id=owner_id,
+                document_id=document_id,
+                chunk_index=chunk_index,
+                start_offset=record["start_offset"],
+                end_offset=record["end_offset"],
+                content_hash=record["content_hash"]
+            )
+            for chunk_index, record in enumerate(records)
+        ]
+        db.add_all(chunks)
+        db.flush()
+
+        if chunks:
+            db.execute(
+                insert(Embedding),
+                [
+                    {
+                        "owner_id": owner_id,
+                        "document_id": document_id,
+                        "chunk_id": chunk.id,
+                        "vector": record["vector"],
+                        "content_hash": record["content_hash"],
+                        "model_name": model_name
+                    }
+                    for chunk, record in zip(chunks, records)
+                ]
+            )
+        return [chunk.id for chunk in chunks]
+
+    def delete_by_document(self, db: Session, document_id: int) -> int:
+        """Delete all chunks of document together with their embeddings"""
+        db.query(Embedding).filter(
+            Embedding.document_id == document_id
+        ).delete(synchronize_session=False)
+        return db.query(DocumentChunk).filter(
+            DocumentChunk.document_id == document_id
+        ).delete(synchronize_session=False)
+
+
+crud_chunk = CRUDChunk()
@@ -0,0 +1,282 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, load_only
+
+from app.core.pagination import paginate
+from app.models.cluster import (
+    ClusterAssignment,
+    ClusterKeyword,
+    ClusterModel,
+    DocumentCluster,
+)
+from app.models.document import Document
+from app.models.keyword import DocumentKeyword
+
+# Cluster keyword weights at or below this are rounding leftovers
+WEIGHT_EPSILON = 1e-6
+
+
+class CRUDCluster:
+    """CRUD operations for document topic clusters"""
+
+    def get_model(self, db: Session, owner_id: int) -> Optional[ClusterModel]:
+        """Get clustering state of owner"""
+        return db.get(ClusterModel, owner_id)
+
+    def get_clusters(self, db: Session, owner_id: int) -> List[DocumentCluster]:
+        """Get clusters of owner in fitted order"""
+        return db.query(DocumentCluster).filter(
+            DocumentCluster.owner_id == owner_id
+        ).order_by(DocumentCluster.position).all()
+
+    def count_clusters(self, db: Session, owner_id: int) -> int:
+        """Count clusters of owner"""
+        return db.query(func.count(DocumentCluster.id)).filter(
+            DocumentCluster.owner_id == owner_id
+        ).scalar()
+
+    def get_sizes(self, db: Session, owner_id: int) -> Dict[int, int]:
+        """Count documents of each cluster"""
+        rows = db.query(ClusterAssignment.cluster_id, func.count()).filter(
+            ClusterAssignment.owner_id == owner_id
+        ).group_by(ClusterAssignment.cluster_id).all()
+        return dict(rows)
+
+    def get_keywords(
+        self,
+        db: Session,
+        cluster_ids: Iterable[int],
+        limit: int
+    ) -> List[Tuple[int, str, float]]:
+        """Get (cluster_id, keyword, weight) of the heaviest keywords of clusters"""
+        ranked = select(
+            ClusterKeyword.cluster_id,
+            ClusterKeyword.keyword,
+            ClusterKeyword.weight,
+            func.row_number().over(
+                partition_by=ClusterKeyword.cluster_id,
+                order_by=ClusterKeyword.weight.desc()
+            ).label("rank")
+        ).where(ClusterKeyword.cluster_id.in_(list(cluster_ids))).subquery()
+
+        return db.query(
+            ranked.c.cluster_id,
+            ranked.c.keyword,
+            ranked.c.weight
+        ).filter(ranked.c.rank <= limit).all()
+
+    def count_clusters_with(
+        self,
+        db: Session,
+        owner_id: int,
+        keywords: Iterable[str]
+    ) -> Dict[str, int]:
+        """Count clusters of owner whose members have each keyword"""
+        keywords = list(keywords)
+        if not keywords:
+            return {}
+
+        rows = db.query(ClusterKeyword.keyword, func.count()).filter(
+            ClusterKeyword.owner_id == owner_id,
+            ClusterKeyword.keyword.in_(keywords)
+        ).group_by(ClusterKeyword.keyword).all()
+        return dict(rows)
+
+    def add_member_keywords(
+        self,
+        db: Session,
+        owner_id: int,
+        document_ids: Optional[Sequence[int]] = None,
+        sign: int = 1
+    ):
+        """Add (sign 1) or subtract (sign -1) member keyword scores
+
+        Keyword scores of the given documents, or of all documents of owner
+        without document_ids, are summed into the clusters they belong to.
+        """
+        query = select(
+            ClusterAssignment.cluster_id,
+            DocumentKeyword.keyword,
+            ClusterAssignment.owner_id,
+            sign * func.sum(DocumentKeyword.score)
+        ).join(
+            DocumentKeyword,
+            DocumentKeyword.document_id == ClusterAssignment.document_id
+        ).where(ClusterAssignment.owner_id == owner_id)
+
+        if document_ids is not None:
+            if not document_ids:
+                return
+            query = query.where(
+                ClusterAssignment.document_id.in_(list(document_ids))
+            )
+
+        statement = pg_insert(ClusterKeyword).from_select(
+            ["cluster_id", "keyword", "owner_id", "weight"],
+            query.group_by(
+                ClusterAssignment.cluster_id,
+                DocumentKeyword.keyword,
+                ClusterAssignment.owner_id
+            )
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ClusterKeyword.cluster_id, ClusterKeyword.keyword],
+            set_={"weight": ClusterKeyword.weight + statement.excluded.weight}
+        ))
+
+        if sign < 0:
+            db.execute(delete(ClusterKeyword).where(
+                ClusterKeyword.owner_id == owner_id,
+                ClusterKeyword.weight <= WEIGHT_EPSILON
+            ))
+
+    def replace(
+        self,
+        db: Session,
+        owner_id: int,
+        num_clusters: int,
+        centroids: List[bytes],
+        assignments: List[Tuple[int, int, float]]
+    ) -> List[DocumentCluster]:
+        """Replace clusters of owner, assignments are (doc, position, score)"""
+        db.execute(delete(DocumentCluster).where(
+            DocumentCluster.owner_id == owner_id
+        ))
+        clusters = [
+            DocumentCluster(
+                owner_id=owner_id,
+                position=position,
+                topic="",
+                centroid=centroid
+            )
+            for position, centroid in enumerate(centroids)
+        ]
+        db.add_all(clusters)
+        db.flush()
+
+        if assignments:
+            db.execute(
+                insert(ClusterAssignment),
+                [
+                    {
+                        "document_id": document_id,
+                        "cluster_id": clusters[position].id,
+                        "owner_id": owner_id,
+                        "score": score
+                    }
+                    for document_id, position, score in assignments
+                ]
+            )
+        # Keywords of the deleted clusters went with them by cascade
+        self.add_member_keywords(db, owner_id)
+
+        model = self.get_model(db, owner_id)
+        if model is None:
+            model = ClusterModel(owner_id=owner_id)
+            db.add(model)
+        model.num_clusters = num_clusters
+        model.fitted_documents = len(assignments)
+        model.assigned_documents = 0
+        model.fitted_at = func.now()
+        return clusters
+
+    def assign(
+        self,
+        db: Session,
+        owner_id: int,
+        document_ids: Sequence[int],
+        assignments: List[Tuple[int, int, float]]
+    ) -> Set[int]:
+        """Replace assignments of documents with (doc, cluster_id, score)
+
+        Returns ids of the clusters documents left or joined.
+        """
+        if not document_ids:
+            return set()
+
+        touched = self.remove_documents(db, owner_id, document_ids)
+        if assignments:
+            db.execute(
+                insert(ClusterAssignment),
+                [
+                    {
+                        "document_id": document_id,
+                        "cluster_id": cluster_id,
+                        "owner_id": owner_id,
+                        "score": score
+                    }
+                    for document_id, cluster_id, score in assignments
+                ]
+            )
+            self.add_member_keywords(db, owner_id, document_ids)
+        db.execute(update(ClusterModel).where(
+            ClusterModel.owner_id == owner_id
+        ).values(
+            assigned_documents=ClusterModel.assigned_documents + len(assignments)
+        ))
+        return touched | {cluster_id for _, cluster_id, _ in assignments}
+
+    def remove_documents(
+        self,
+        db: Session,
+        owner_id: int,
+        document_ids: Sequence[int]
+    ) -> Set[int]:
+        """Take documents out of their clusters, returns ids of the clusters"""
+        document_ids = list(document_ids)
+        cluster_ids = {
+            cluster_id for cluster_id, in db.query(
+                ClusterAssignment.cluster_id
+            ).filter(ClusterAssignment.document_id.in_(document_ids)).distinct()
+        }
+        if not cluster_ids:
+            return set()
+
+        self.add_member_keywords(db, owner_id, document_ids, sign=-1)
+        db.execute(delete(ClusterAssignment).where(
+            ClusterAssignment.document_id.in_(document_ids)
+        ))
+        return cluster_ids
+
+    def set_topics(self, db: Session, topics: Dict[int, str]):
+        """Set topic labels of clusters"""
+        for cluster_id, topic in topics.items():
+            db.execute(update(DocumentCluster).where(
+                DocumentCluster.id == cluster_id
+            ).values(topic=topic))
+
+    def get_documents(
+        self,
+        db: Session,
+        owner_id: int,
+        cluster_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 10
+    ) -> Tuple[List[Document], Optional[str]]:
+        """Get page of cluster documents without content, closest first"""
+        query = db.query(Document).join(
+            ClusterAssignment,
+            ClusterAssignment.document_id == Document.id
+        ).filter(
+            ClusterAssignment.owner_id == owner_id,
+            ClusterAssignment.cluster_id == cluster_id
+        ).options(
+            load_only(
+                Document.id,
+                Document.title,
+                Document.file_type,
+                Document.created_at,
+                raiseload=True
+            )
+        )
+        return paginate(
+            query,
+            [ClusterAssignment.score, Document.id],
+            cursor,
+            limit
+        )
+
+
+crud_cluster = CRUDCluster()
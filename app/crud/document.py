@@ -1,9 +1,17 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 
-from app.models.document import Document
+from app.core.pagination import paginate
+from app.crud.chunk import crud_chunk
+from app.crud.cluster import crud_cluster
+from app.crud.index_operation import crud_index_operation
+from app.models.document import SEARCH_CONFIG, Document
+from app.models.index_operation import REMOVE, UPSERT
 from app.schemas.document import DocumentCreate, DocumentUpdate
+from app.services.embedding_service import embedding_service
+from app.services.keyword_service import document_text, keyword_service
 
 
 class CRUDDocument:
@@ -21,17 +29,66 @@ class CRUDDocument:
             Document.owner_id == owner_id
         ).first()
 
-    def get_all_by_owner(
+    def get_by_ids(
         self,
         db: Session,
-        owner_id: int,
-        skip: int = 0,
-        limit: int = 100
+        doc_ids: Sequence[int],
+        owner_id: int
     ) -> List[Document]:
-        """Get all documents for owner with pagination"""
+        """Get documents by IDs for specific owner, in no particular order"""
         return db.query(Document).filter(
+            Document.id.in_(list(doc_ids)),
             Document.owner_id == owner_id
-        ).offset(skip).limit(limit).all()
+        ).all()
+
+    def get_all_by_owner(
+        self,
+        db: Session,
+        owner_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Document], Optional[str]]:
+        """Get page of owner documents, newest first, and next page cursor
+
+        With fields only these columns are loaded, others raise on access.
+        """
+        query = db.query(Document).filter(Document.owner_id == owner_id)
+        if fields is not None:
+            query = query.options(
+                load_only(
+                    *[getattr(Document, name) for name in fields],
+                    raiseload=True
+                )
+            )
+        return paginate(query, [Document.created_at, Document.id], cursor, limit)
+
+    def search(
+        self,
+        db: Session,
+        owner_id: int,
+        q: str,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Document], Optional[str]]:
+        """Full-text search in title and content ordered by relevance"""
+        query = db.query(Document).filter(
+            Document.owner_id == owner_id,
+            self.search_filter(q)
+        )
+        return paginate(query, [self.search_rank(q), Document.id], cursor, limit)
+
+    @staticmethod
+    def search_filter(q: str):
+        """Condition matching documents against web search syntax query"""
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        return Document.search_vector.op("@@")(ts_query)
+
+    @staticmethod
+    def search_rank(q: str):
+        """Relevance of document for query, title matches weigh more"""
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        return func.ts_rank_cd(Document.search_vector, ts_query)
 
     def create(
         self,
@@ -42,8 +99,17 @@ class CRUDDocument:
         """Create new document"""
         doc = Document(**doc_data.model_dump(), owner_id=owner_id)
         db.add(doc)
+        db.flush()
+        crud_index_operation.add(db, owner_id, doc.id, UPSERT)
         db.commit()
         db.refresh(doc)
+        embedding_service.enqueue_upsert(owner_id, doc.id)
+        keyword_service.enqueue_update(
+            owner_id,
+            doc.id,
+            None,
+            document_text(doc.title, doc.content)
+        )
         return doc
 
     def create_with_file(
@@ -63,8 +129,17 @@ class CRUDDocument:
             file_type=file_meta["file_type"]
         )
         db.add(doc)
+        db.flush()
+        crud_index_operation.add(db, owner_id, doc.id, UPSERT)
         db.commit()
         db.refresh(doc)
+        embedding_service.enqueue_upsert(owner_id, doc.id)
+        keyword_service.enqueue_update(
+            owner_id,
+            doc.id,
+            None,
+            document_text(doc.title, doc.content)
+        )
         return doc
 
     def update(
@@ -77,12 +152,26 @@ class CRUDDocument:
         """Update document"""
         doc = self.get_by_id(db, doc_id, owner_id)
         if doc:
+            old_text = document_text(doc.title, doc.content)
             update_data = doc_data.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(doc, field, value)
 
+            # Only text changes affect the semantic index and keywords
+            text_changed = bool({"title", "content"} & update_data.keys())
+            if text_changed:
+                crud_index_operation.add(db, owner_id, doc.id, UPSERT)
             db.commit()
             db.refresh(doc)
+
+            if text_changed:
+                embedding_service.enqueue_upsert(owner_id, doc.id)
+                keyword_service.enqueue_update(
+                    owner_id,
+                    doc.id,
+                    old_text,
+                    document_text(doc.title, doc.content)
+                )
         return doc
 
     def delete(
@@ -94,8 +183,14 @@ class CRUDDocument:
         """Delete document"""
         doc = self.get_by_id(db, doc_id, owner_id)
         if doc:
+            old_text = document_text(doc.title, doc.content)
+            crud_chunk.delete_by_document(db, doc_id)
+            crud_cluster.remove_documents(db, owner_id, [doc_id])
             db.delete(doc)
+            crud_index_operation.add(db, owner_id, doc_id, REMOVE)
             db.commit()
+            embedding_service.enqueue_remove(owner_id, doc_id)
+            keyword_service.enqueue_update(owner_id, doc_id, old_text, None)
             return True
         return False
 
@@ -0,0 +1,64 @@
+from typing import Dict, Tuple
+
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.index_operation import IndexOperation
+
+
+class CRUDIndexOperation:
+    """CRUD operations for queued semantic index updates"""
+
+    def add(self, db: Session, owner_id: int, document_id: int, operation: str):
+        """Queue operation for document, replacing any queued before"""
+        statement = pg_insert(IndexOperation).values(
+            document_id=document_id,
+            owner_id=owner_id,
+            operation=operation,
+            version=1
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[IndexOperation.document_id],
+            set_={
+                "operation": statement.excluded.operation,
+                "version": IndexOperation.version + 1,
+                "queued_at": statement.excluded.queued_at
+            }
+        ))
+
+    def get_pending(
+        self,
+        db: Session,
+        owner_id: int
+    ) -> Dict[int, Tuple[str, int]]:
+        """Get queued (operation, version) of owner documents"""
+        rows = db.query(
+            IndexOperation.document_id,
+            IndexOperation.operation,
+            IndexOperation.version
+        ).filter(IndexOperation.owner_id == owner_id).all()
+        return {
+            document_id: (operation, version)
+            for document_id, operation, version in rows
+        }
+
+    def remove_applied(
+        self,
+        db: Session,
+        applied: Dict[int, Tuple[str, int]]
+    ):
+        """Delete applied operations unless documents changed again since"""
+        if not applied:
+            return
+
+        db.execute(delete(IndexOperation).where(
+            tuple_(IndexOperation.document_id, IndexOperation.version).in_([
+                (document_id, version)
+                for document_id, (_, version) in applied.items()
+            ])
+        ))
+        db.commit()
+
+
+crud_index_operation = CRUDIndexOperation()
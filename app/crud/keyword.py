@@ -0,0 +1,179 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.crud.cluster import crud_cluster
+from app.models.keyword import DocumentKeyword, KeywordModel, TermFrequency
+
+
+class CRUDKeywordModel:
+    """CRUD operations for per-user TF-IDF document frequencies"""
+
+    def get_model(self, db: Session, owner_id: int) -> Optional[KeywordModel]:
+        """Get model state of owner"""
+        return db.get(KeywordModel, owner_id)
+
+    def get_document_counts(
+        self,
+        db: Session,
+        owner_id: int,
+        terms: Iterable[str]
+    ) -> Dict[str, int]:
+        """Get document frequencies of terms, absent terms are left out"""
+        terms = list(terms)
+        if not terms:
+            return {}
+
+        rows = db.query(TermFrequency.term, TermFrequency.document_count).filter(
+            TermFrequency.owner_id == owner_id,
+            TermFrequency.term.in_(terms)
+        ).all()
+        return dict(rows)
+
+    def apply_deltas(
+        self,
+        db: Session,
+        owner_id: int,
+        deltas: Dict[str, int],
+        document_delta: int
+    ):
+        """Add changes of document frequencies and document count"""
+        if deltas:
+            statement = pg_insert(TermFrequency).values([
+                {"owner_id": owner_id, "term": term, "document_count": delta}
+                for term, delta in deltas.items()
+            ])
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[TermFrequency.owner_id, TermFrequency.term],
+                set_={
+                    "document_count": (
+                        TermFrequency.document_count
+                        + statement.excluded.document_count
+                    )
+                }
+            ))
+            db.execute(delete(TermFrequency).where(
+                TermFrequency.owner_id == owner_id,
+                TermFrequency.document_count <= 0
+            ))
+
+        if document_delta:
+            db.execute(update(KeywordModel).where(
+                KeywordModel.owner_id == owner_id
+            ).values(
+                document_count=KeywordModel.document_count + document_delta
+            ))
+
+    def replace(
+        self,
+        db: Session,
+        owner_id: int,
+        counts: Dict[str, int],
+        document_count: int
+    ):
+        """Replace all document frequencies of owner with a fresh count"""
+        db.execute(delete(TermFrequency).where(TermFrequency.owner_id == owner_id))
+        if counts:
+            db.execute(
+                insert(TermFrequency),
+                [
+                    {"owner_id": owner_id, "term": term, "document_count": count}
+                    for term, count in counts.items()
+                ]
+            )
+
+        statement = pg_insert(KeywordModel).values(
+            owner_id=owner_id,
+            document_count=document_count
+        )
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[KeywordModel.owner_id],
+            set_={
+                "document_count": statement.excluded.document_count,
+                "fitted_at": statement.excluded.fitted_at
+            }
+        ))
+
+
+class CRUDDocumentKeyword:
+    """CRUD operations for stored document keywords and their postings"""
+
+    def get_keywords(self, db: Session, document_id: int) -> List[str]:
+        """Get keywords of document"""
+        rows = db.query(DocumentKeyword.keyword).filter(
+            DocumentKeyword.document_id == document_id
+        ).all()
+        return [keyword for keyword, in rows]
+
+    def replace_for_documents(
+        self,
+        db: Session,
+        owner_id: int,
+        keywords: Dict[int, List[Tuple[str, float]]]
+    ):
+        """Replace keywords of documents with scored keywords"""
+        if not keywords:
+            return
+
+        # Keyword weights of clusters follow the keywords of their members
+        crud_cluster.add_member_keywords(db, owner_id, list(keywords), sign=-1)
+        db.execute(delete(DocumentKeyword).where(
+            DocumentKeyword.document_id.in_(list(keywords))
+        ))
+        records = [
+            {
+                "document_id": document_id,
+                "keyword": keyword,
+                "owner_id": owner_id,
+                "score": score
+            }
+            for document_id, scored in keywords.items()
+            for keyword, score in scored
+        ]
+        if records:
+            db.execute(insert(DocumentKeyword), records)
+        crud_cluster.add_member_keywords(db, owner_id, list(keywords))
+
+    def count_shared(
+        self,
+        db: Session,
+        owner_id: int,
+        keywords: List[str],
+        exclude_document_id: int
+    ) -> Dict[int, int]:
+        """Count keywords shared with each document in their postings"""
+        if not keywords:
+            return {}
+
+        rows = db.query(
+            DocumentKeyword.document_id,
+            func.count()
+        ).filter(
+            DocumentKeyword.owner_id == owner_id,
+            DocumentKeyword.keyword.in_(keywords),
+            DocumentKeyword.document_id != exclude_document_id
+        ).group_by(DocumentKeyword.document_id).all()
+        return dict(rows)
+
+    def count_keywords(
+        self,
+        db: Session,
+        document_ids: List[int]
+    ) -> Dict[int, int]:
+        """Count keywords of each document"""
+        if not document_ids:
+            return {}
+
+        rows = db.query(
+            DocumentKeyword.document_id,
+            func.count()
+        ).filter(
+            DocumentKeyword.document_id.in_(document_ids)
+        ).group_by(DocumentKeyword.document_id).all()
+        return dict(rows)
+
+
+crud_keyword_model = CRUDKeywordModel()
+crud_document_keyword = CRUDDocumentKeyword()
@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from app.models.neighbor import DocumentNeighbor
+
+
+class CRUDNeighbor:
+    """CRUD operations for the document neighbour graph"""
+
+    def get_neighbors(
+        self,
+        db: Session,
+        document_id: int,
+        limit: int
+    ) -> List[Tuple[int, float]]:
+        """Get nearest documents with scores, most similar first"""
+        rows = db.query(DocumentNeighbor.neighbor_id, DocumentNeighbor.score).filter(
+            DocumentNeighbor.document_id == document_id
+        ).order_by(DocumentNeighbor.score.desc()).limit(limit).all()
+        return [(neighbor_id, score) for neighbor_id, score in rows]
+
+    def get_referrers(self, db: Session, document_ids: Iterable[int]) -> Set[int]:
+        """Get documents having any of the documents as neighbour"""
+        document_ids = list(document_ids)
+        if not document_ids:
+            return set()
+
+        rows = db.query(DocumentNeighbor.document_id).filter(
+            DocumentNeighbor.neighbor_id.in_(document_ids)
+        ).distinct().all()
+        return {document_id for document_id, in rows}
+
+    def get_thresholds(
+        self,
+        db: Session,
+        document_ids: Iterable[int]
+    ) -> Dict[int, Tuple[int, float]]:
+        """Get neighbour count and lowest neighbour score of documents"""
+        document_ids = list(document_ids)
+        if not document_ids:
+            return {}
+
+        rows = db.query(
+            DocumentNeighbor.document_id,
+            func.count(),
+            func.min(DocumentNeighbor.score)
+        ).filter(
+            DocumentNeighbor.document_id.in_(document_ids)
+        ).group_by(DocumentNeighbor.document_id).all()
+        return {document_id: (count, score) for document_id, count, score in rows}
+
+    def replace_for_documents(
+        self,
+        db: Session,
+        owner_id: int,
+        neighbors: Dict[int, List[Tuple[int, float]]]
+    ):
+        """Replace neighbours of documents"""
+        if not neighbors:
+            return
+
+        db.execute(delete(DocumentNeighbor).where(
+            DocumentNeighbor.document_id.in_(list(neighbors))
+        ))
+        self._insert(db, owner_id, neighbors)
+
+    def replace_for_owner(
+        self,
+        db: Session,
+        owner_id: int,
+        neighbors: Dict[int, List[Tuple[int, float]]]
+    ):
+        """Replace the whole neighbour graph of owner"""
+        db.execute(delete(DocumentNeighbor).where(
+            DocumentNeighbor.owner_id == owner_id
+        ))
+        self._insert(db, owner_id, neighbors)
+
+    @staticmethod
+    def _insert(
+        db: Session,
+        owner_id: int,
+        neighbors: Dict[int, List[Tuple[int, float]]]
+    ):
+        records = [
+            {
+                "document_id": document_id,
+                "neighbor_id": neighbor_id,
+                "owner_id": owner_id,
+                "score": score
+            }
+            for document_id, edges in neighbors.items()
+            for neighbor_id, score in edges
+        ]
+        if records:
+            db.execute(insert(DocumentNeighbor), records)
+
+
+crud_neighbor = CRUDNeighbor()
@@ -1,6 +1,9 @@
 ﻿import os
 
-from fastapi import FastAPI, Request
+# Imported first so the start-up clock covers all other imports
+from app.core.startup import startup_report  # isort: skip
+
+from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
@@ -15,6 +18,7 @@ from app.api import (
     web_auth,
 )
 from app.middleware.auth_middleware import AuthMiddleware
+from app.services.prewarm import model_prewarmer
 
 app = FastAPI(title="Knowledge Base API", version="1.0.0")
 
@@ -52,6 +56,25 @@ async def startup_event():
     os.makedirs("app/static/css", exist_ok=True)
     os.makedirs("app/static/js", exist_ok=True)
 
+    # Load selected models in background, readiness waits for them
+    model_prewarmer.start()
+    startup_report.mark_ready()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Actions on application shutdown"""
+    from app.services.cluster_service import cluster_service
+    from app.services.embedding_service import embedding_service
+    from app.services.inference import inference_executor
+    from app.services.keyword_service import keyword_service
+
+    # Queued fits and index updates encode passages, so inference stops last
+    cluster_service.shutdown()
+    embedding_service.shutdown()
+    keyword_service.shutdown()
+    inference_executor.shutdown()
+
 
 @app.get("/")
 def read_root():
@@ -60,11 +83,30 @@ def read_root():
 
 
 @app.get("/health")
+@app.get("/health/live")
 def health_check():
-    """Health check endpoint"""
+    """Liveness check endpoint"""
     return {"status": "healthy", "database": "postgresql"}
 
 
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness check, fails while models load or when a required one failed"""
+    report = model_prewarmer.report()
+    if not model_prewarmer.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=report
+        )
+    return report
+
+
+@app.get("/startup-report")
+def get_startup_report():
+    """Start-up time and heavy ML modules imported so far"""
+    return startup_report.as_dict()
+
+
 @app.get("/debug-tables")
 def debug_tables():
     """Check table existence"""
@@ -18,6 +18,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
             "/health",
             "/docs",
             "/redoc",
+            "/startup-report",
             "/debug-tables"
         ]
 
@@ -0,0 +1,113 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class ClusterModel(Base):
+    """Per-user state of the document topic clustering"""
+    __tablename__ = "cluster_models"
+
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    num_clusters = Column(Integer, nullable=False)
+    # Documents the centroids were fitted on and assigned since then
+    fitted_documents = Column(Integer, nullable=False)
+    assigned_documents = Column(Integer, nullable=False, default=0)
+    fitted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<ClusterModel(owner_id={self.owner_id}, "
+            f"num_clusters={self.num_clusters})>"
+        )
+
+
+class DocumentCluster(Base):
+    """Topic cluster of user documents"""
+    __tablename__ = "document_clusters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    position = Column(Integer, nullable=False)
+    topic = Column(String, nullable=False)
+    # Little-endian float32 unit vector, decoded with numpy.frombuffer
+    centroid = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<DocumentCluster(id={self.id}, topic='{self.topic}')>"
+
+
+class ClusterAssignment(Base):
+    """Cluster a document belongs to"""
+    __tablename__ = "document_cluster_assignments"
+
+    document_id = Column(
+        Integer,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    cluster_id = Column(
+        Integer,
+        ForeignKey("document_clusters.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # Cosine similarity of document vector and cluster centroid
+    score = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<ClusterAssignment(document_id={self.document_id}, "
+            f"cluster_id={self.cluster_id})>"
+        )
+
+
+class ClusterKeyword(Base):
+    """Summed keyword scores of the documents in a cluster"""
+    __tablename__ = "cluster_keywords"
+    __table_args__ = (
+        Index("ix_cluster_keywords_owner_id_keyword", "owner_id", "keyword"),
+    )
+
+    cluster_id = Column(
+        Integer,
+        ForeignKey("document_clusters.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    keyword = Column(String, primary_key=True)
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    weight = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<ClusterKeyword(cluster_id={self.cluster_id}, "
+            f"keyword='{self.keyword}')>"
+        )
@@ -1,13 +1,62 @@
-from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from .base import Base
 
+# Text search configuration of the search_vector column and its queries
+SEARCH_CONFIG = "english"
+
+# Title lexemes rank above content lexemes. Content is cut off because a
+# tsvector is limited to 1MB.
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+    f"left(coalesce(content, ''), 500000)), 'B')"
+)
+
 
 class Document(Base):
     """Document model"""
     __tablename__ = "documents"
+    __table_args__ = (
+        # Backs keyset pagination of owner documents, newest first
+        Index(
+            "ix_documents_owner_id_created_at_id",
+            "owner_id",
+            "created_at",
+            "id"
+        ),
+        Index(
+            "ix_documents_search_vector",
+            "search_vector",
+            postgresql_using="gin"
+        ),
+        # pg_trgm indexes serve ILIKE substring filters and fuzzy matching
+        Index(
+            "ix_documents_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_documents_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"}
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -19,6 +68,10 @@ class Document(Base):
     file_type = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Maintained by Postgres, deferred so listings do not load it
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True))
+    )
 
     owner = relationship("User", backref="documents")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import ARRAY, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,15 +10,32 @@ class Embedding(Base):
     __tablename__ = "embeddings"
 
     id = Column(Integer, primary_key=True, index=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
-    embedding_vector = Column(ARRAY(Float), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    document_id = Column(
+        Integer,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    chunk_id = Column(
+        Integer,
+        ForeignKey("document_chunks.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # Little-endian float32 values, decoded with numpy.frombuffer
+    vector = Column(LargeBinary, nullable=False)
+    content_hash = Column(String(64), nullable=True)
     model_name = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     owner = relationship("User")
     document = relationship("Document")
+    chunk = relationship("DocumentChunk")
 
     def __repr__(self):
-        return f"<Embedding(id={self.id}, document_id={self.document_id})>"
+        return (
+            f"<Embedding(id={self.id}, document_id={self.document_id}, "
+            f"chunk_id={self.chunk_id})>"
+        )
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from .base import Base
+
+UPSERT = "upsert"
+REMOVE = "remove"
+
+
+class IndexOperation(Base):
+    """Document change not yet applied to the semantic index of its owner
+
+    Written in the transaction of the change, so queued index updates
+    survive restarts and crashes. ``version`` grows with every change of
+    the document, so a flush only deletes the operations it applied.
+    """
+    __tablename__ = "index_operations"
+
+    # Removals outlive their document, so there is no foreign key
+    document_id = Column(Integer, primary_key=True)
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    operation = Column(String(16), nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    queued_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<IndexOperation(document_id={self.document_id}, "
+            f"operation='{self.operation}', version={self.version})>"
+        )
@@ -0,0 +1,71 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class KeywordModel(Base):
+    """Per-user TF-IDF model state, terms are stored in TermFrequency"""
+    __tablename__ = "keyword_models"
+
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    # Number of documents the document frequencies were counted over
+    document_count = Column(Integer, nullable=False, default=0)
+    fitted_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return (
+            f"<KeywordModel(owner_id={self.owner_id}, "
+            f"document_count={self.document_count})>"
+        )
+
+
+class TermFrequency(Base):
+    """Number of documents of a user containing a term"""
+    __tablename__ = "term_frequencies"
+
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    term = Column(String, primary_key=True)
+    document_count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<TermFrequency(owner_id={self.owner_id}, term='{self.term}', "
+            f"document_count={self.document_count})>"
+        )
+
+
+class DocumentKeyword(Base):
+    """Keyword of a document, indexed by keyword as a posting list"""
+    __tablename__ = "document_keywords"
+    __table_args__ = (
+        Index("ix_document_keywords_owner_id_keyword", "owner_id", "keyword"),
+    )
+
+    document_id = Column(
+        Integer,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    keyword = Column(String, primary_key=True)
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    score = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<DocumentKeyword(document_id={self.document_id}, "
+            f"keyword='{self.keyword}')>"
+        )
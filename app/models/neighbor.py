@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer
+
+from .base import Base
+
+
+class DocumentNeighbor(Base):
+    """Edge of the k-nearest-neighbour graph of user documents"""
+    __tablename__ = "document_neighbors"
+
+    document_id = Column(
+        Integer,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    neighbor_id = Column(
+        Integer,
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True
+    )
+    owner_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # Cosine similarity of the closest passages of both documents
+    score = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<DocumentNeighbor(document_id={self.document_id}, "
+            f"neighbor_id={self.neighbor_id}, score={self.score})>"
+        )
@@ -35,6 +35,31 @@ class DocumentResponse(DocumentBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DocumentSummary(BaseModel):
+    """Schema for document listing without content"""
+    id: int
+    owner_id: Optional[int] = None
+    title: Optional[str] = None
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    file_type: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class PassageMatch(BaseModel):
+    """Schema for matching passage of a document"""
+    start_offset: int
+    end_offset: int
+    score: float
+
+
+class SemanticSearchResult(DocumentResponse):
+    """Schema for semantic search result with matching passages"""
+    score: float
+    passages: List[PassageMatch] = []
+
+
 class NoteCreate(BaseModel):
     """Schema for creating a note"""
     title: str
@@ -0,0 +1,121 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EncodeBatcher:
+    """Collects concurrent encode requests into a single model call
+
+    Requests arriving within ``max_wait_ms`` of the first queued one are
+    encoded together, up to ``max_batch_size`` texts per batch.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int,
+        max_wait_ms: float
+    ):
+        self.encode_batch = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self.histogram: Dict[int, int] = {}
+        self._queue: queue.Queue[tuple] = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def encode(self, text: str) -> np.ndarray:
+        """Encode one text, sharing the model call with concurrent callers"""
+        return self.submit(text).result()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text for the next batch and return its future"""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    def _ensure_worker(self):
+        """Start background batching thread on first use"""
+        if self._worker is not None:
+            return
+
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="encode-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        """Collect and encode batches forever"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._encode(batch)
+
+    def _encode(self, batch: List[tuple]):
+        """Encode batch and hand each caller its own vector"""
+        # Identical texts in one batch are encoded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = self.encode_batch(texts)
+        except Exception as e:
+            logger.error(f"Error encoding batch of {len(texts)} texts: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        positions = {text: position for position, text in enumerate(texts)}
+        for text, future in batch:
+            future.set_result(vectors[positions[text]:positions[text] + 1])
+
+        self._record(len(batch))
+
+    def _record(self, batch_size: int):
+        """Count batch in power-of-two size buckets"""
+        bucket = 1
+        while bucket < batch_size:
+            bucket *= 2
+
+        with self._lock:
+            self.batches += 1
+            self.requests += batch_size
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def stats(self) -> Dict:
+        """Get batch counters and batch size histogram"""
+        with self._lock:
+            mean_batch_size = self.requests / self.batches if self.batches else 0.0
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": mean_batch_size,
+                "batch_size_histogram": {
+                    f"<={bucket}": count
+                    for bucket, count in sorted(self.histogram.items())
+                }
+            }
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import List
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Passage:
+    """Passage of text given by character offsets"""
+    start: int
+    end: int
+
+
+class ChunkingService:
+    """Service for splitting long texts into overlapping passages"""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = min(chunk_overlap, chunk_size // 2)
+
+    def split(self, text: str) -> List[Passage]:
+        """Split text into overlapping passages ending at word boundaries"""
+        if not text or not text.strip():
+            return []
+
+        passages = []
+        start = 0
+        length = len(text)
+
+        while start < length:
+            end = min(start + self.chunk_size, length)
+            if end < length:
+                # Prefer to cut at whitespace in the second half of the window
+                boundary = max(
+                    text.rfind(" ", start + self.chunk_size // 2, end),
+                    text.rfind("\n", start + self.chunk_size // 2, end)
+                )
+                if boundary > start:
+                    end = boundary
+
+            if text[start:end].strip():
+                passages.append(Passage(start=start, end=end))
+
+            if end >= length:
+                break
+
+            next_start = max(end - self.chunk_overlap, start + 1)
+            # Start the next passage at the beginning of a word
+            space = text.find(" ", next_start, end)
+            start = space + 1 if space != -1 else next_start
+
+        return passages
+
+
+# Global service instance
+chunking_service = ChunkingService(settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
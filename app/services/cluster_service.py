@@ -0,0 +1,250 @@
+import logging
+import math
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.chunk import VECTOR_DTYPE, crud_chunk
+from app.crud.cluster import crud_cluster
+from app.models.cluster import ClusterModel
+from app.services.keyword_service import keyword_service
+
+logger = logging.getLogger(__name__)
+
+# Keywords joined into the topic label of a cluster
+TOPIC_TERMS = 3
+
+# Heaviest keywords of a cluster considered for its label
+TOPIC_CANDIDATES = 50
+
+
+class ClusterService:
+    """Topic clustering of user documents by their embeddings
+
+    A document is represented by the normalized mean of its passage
+    vectors. Centroids are fitted with MiniBatchKMeans and new or changed
+    documents are assigned to the nearest centroid. Centroids are fitted
+    again once more documents were assigned than they were fitted on.
+    Fits run on a background thread, requests serve the last fit.
+    """
+
+    def __init__(self, num_clusters: int):
+        self.num_clusters = num_clusters
+        self._queued: Set[int] = set()
+        self._lock = threading.Lock()
+        self._fit_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="cluster-fits"
+        )
+
+    def fit(
+        self,
+        db: Session,
+        owner_id: int,
+        model_key: str,
+        num_clusters: int
+    ):
+        """Fit clusters over all documents of owner and label them"""
+        from sklearn.cluster import MiniBatchKMeans
+
+        # Cluster keyword weights are summed from stored document keywords
+        keyword_service.ensure_fitted(db, owner_id)
+
+        document_ids, vectors = self._document_vectors(db, owner_id, model_key)
+        centroids = np.empty((0, 0), dtype=VECTOR_DTYPE)
+        assignments = []
+        if len(document_ids):
+            kmeans = MiniBatchKMeans(
+                n_clusters=min(num_clusters, len(document_ids)),
+                random_state=0,
+                batch_size=1024,
+                n_init=3
+            ).fit(vectors)
+            centroids = self._normalize(kmeans.cluster_centers_).astype(VECTOR_DTYPE)
+            positions = kmeans.labels_
+            scores = np.sum(vectors * centroids[positions], axis=1)
+            assignments = [
+                (int(doc_id), int(position), float(score))
+                for doc_id, position, score in zip(document_ids, positions, scores)
+            ]
+
+        clusters = crud_cluster.replace(
+            db,
+            owner_id,
+            num_clusters,
+            [centroid.tobytes() for centroid in centroids],
+            assignments
+        )
+        self._label(db, owner_id, {cluster.id for cluster in clusters})
+        db.commit()
+        logger.info(
+            f"Clustered {len(document_ids)} documents of user {owner_id} "
+            f"into {len(centroids)} clusters"
+        )
+
+    def needs_fit(self, model: Optional[ClusterModel]) -> bool:
+        """Check whether clusters are missing, of another count or outgrown"""
+        return (
+            model is None
+            or model.num_clusters != self.num_clusters
+            or model.assigned_documents > model.fitted_documents
+        )
+
+    def enqueue_fit(self, owner_id: int):
+        """Fit clusters of owner in background unless already queued"""
+        with self._lock:
+            if owner_id in self._queued:
+                return
+            self._queued.add(owner_id)
+        self._fit_executor.submit(self._fit_in_background, owner_id)
+
+    def _fit_in_background(self, owner_id: int):
+        """Fit clusters using a dedicated database session"""
+        from app.services.embedding_service import (
+            IndexBuildPending,
+            embedding_service,
+        )
+
+        db = SessionLocal()
+        try:
+            with self._lock:
+                self._queued.discard(owner_id)
+            # Documents are clustered by vectors stored when indexing them
+            embedding_service.get_user_index(db, owner_id)
+            if self.needs_fit(crud_cluster.get_model(db, owner_id)):
+                self.fit(db, owner_id, embedding_service.model_key, self.num_clusters)
+        except IndexBuildPending:
+            logger.info(f"Index of user {owner_id} is still building, fit skipped")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error fitting clusters for user {owner_id}: {e}")
+        finally:
+            db.close()
+
+    def shutdown(self):
+        """Finish queued cluster fits"""
+        self._fit_executor.shutdown(wait=True)
+
+    def assign(
+        self,
+        db: Session,
+        owner_id: int,
+        model_key: str,
+        document_ids: Iterable[int]
+    ):
+        """Assign new or changed documents to their nearest cluster"""
+        document_ids = list(document_ids)
+        if not document_ids or crud_cluster.get_model(db, owner_id) is None:
+            # Clusters are fitted on first request
+            return
+
+        clusters = crud_cluster.get_clusters(db, owner_id)
+        found_ids, vectors = self._document_vectors(
+            db,
+            owner_id,
+            model_key,
+            document_ids
+        )
+
+        assignments = []
+        if clusters and len(found_ids):
+            centroids = np.vstack([
+                np.frombuffer(cluster.centroid, dtype=VECTOR_DTYPE)
+                for cluster in clusters
+            ])
+            similarities = vectors @ centroids.T
+            positions = np.argmax(similarities, axis=1)
+            assignments = [
+                (int(doc_id), clusters[position].id, float(similarity[position]))
+                for doc_id, position, similarity in zip(
+                    found_ids,
+                    positions,
+                    similarities
+                )
+            ]
+
+        touched = crud_cluster.assign(db, owner_id, document_ids, assignments)
+        self._label(db, owner_id, touched)
+        db.commit()
+
+    def _label(
+        self,
+        db: Session,
+        owner_id: int,
+        cluster_ids: Set[int]
+    ):
+        """Label clusters with keywords weighty in them and rare elsewhere
+
+        Keyword weights are the summed TF-IDF scores of member documents,
+        kept per cluster as documents move, and are weighted by the inverse
+        number of clusters sharing the keyword.
+        """
+        if not cluster_ids:
+            return
+
+        weights: Dict[int, Dict[str, float]] = defaultdict(dict)
+        for cluster_id, keyword, weight in crud_cluster.get_keywords(
+            db,
+            cluster_ids,
+            TOPIC_CANDIDATES
+        ):
+            weights[cluster_id][keyword] = weight
+
+        num_clusters = crud_cluster.count_clusters(db, owner_id)
+        clusters_with = crud_cluster.count_clusters_with(
+            db,
+            owner_id,
+            {keyword for keywords in weights.values() for keyword in keywords}
+        )
+
+        topics = {}
+        for cluster_id in cluster_ids:
+            keywords = weights.get(cluster_id, {})
+            ranked = sorted(
+                keywords,
+                key=lambda keyword: -keywords[keyword] * math.log(
+                    1 + num_clusters / clusters_with.get(keyword, 1)
+                )
+            )
+            topics[cluster_id] = ", ".join(ranked[:TOPIC_TERMS]) or "Other"
+        crud_cluster.set_topics(db, topics)
+
+    @staticmethod
+    def _document_vectors(
+        db: Session,
+        owner_id: int,
+        model_key: str,
+        document_ids: Optional[List[int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Normalized mean passage vector of each document"""
+        rows, vectors = crud_chunk.get_with_vectors(
+            db,
+            owner_id,
+            model_key,
+            document_ids
+        )
+        if not rows:
+            return np.empty(0, dtype="int64"), np.empty((0, 0), dtype="float32")
+
+        # Rows come grouped by document
+        chunk_document_ids = np.array([row.document_id for row in rows])
+        starts = np.flatnonzero(
+            np.r_[True, chunk_document_ids[1:] != chunk_document_ids[:-1]]
+        )
+        sums = np.add.reduceat(vectors.astype("float32"), starts, axis=0)
+        return chunk_document_ids[starts], ClusterService._normalize(sums)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+# Global service instance
+cluster_service = ClusterService(settings.CLUSTER_COUNT)
@@ -0,0 +1,181 @@
+import importlib.util
+import logging
+import re
+import threading
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, Tuple, Type
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend:
+    """Full-precision PyTorch SentenceTransformer inference"""
+    name = "torch"
+    # Modules and sentence-transformers release needed beyond the core install
+    required_modules: Tuple[str, ...] = ()
+    min_sentence_transformers: Tuple[int, ...] = ()
+    extra = ""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_key(self) -> str:
+        """Key of stored vectors, vectors of different backends are not mixed"""
+        if self.name == EmbeddingBackend.name:
+            return self.model_name
+        return f"{self.model_name}@{self.name}"
+
+    def load(self):
+        """Load model once"""
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    logger.info(
+                        f"Loading embedding model {self.model_name} "
+                        f"with {self.name} backend"
+                    )
+                    self.model = self._load()
+        return self.model
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name, device="cpu")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Create normalized embeddings for texts"""
+        model = self.load()
+        return model.encode(texts, normalize_embeddings=True)
+
+
+class Int8Backend(EmbeddingBackend):
+    """PyTorch model with dynamically int8-quantized linear layers"""
+    name = "int8"
+
+    def _load(self):
+        import torch
+
+        model = super()._load()
+        return torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+
+
+class OnnxBackend(EmbeddingBackend):
+    """ONNX Runtime export of the model"""
+    name = "onnx"
+    required_modules = ("onnxruntime", "optimum")
+    min_sentence_transformers = (3, 2)
+    extra = "onnx"
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name, device="cpu", backend="onnx")
+
+
+BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    backend.name: backend
+    for backend in (EmbeddingBackend, Int8Backend, OnnxBackend)
+}
+
+
+def create_backend(name: str, model_name: str) -> EmbeddingBackend:
+    """Create inference backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{name}'. "
+            f"Available backends: {', '.join(BACKENDS)}"
+        )
+    backend = BACKENDS[name]
+    missing = _missing_requirements(backend)
+    if missing:
+        raise ValueError(
+            f"Embedding backend '{name}' needs {', '.join(missing)}. "
+            f"Install it with: pip install 'knowledge-base[{backend.extra}]'"
+        )
+    return backend(model_name)
+
+
+def _missing_requirements(backend: Type[EmbeddingBackend]) -> List[str]:
+    """Requirements of backend that are not installed, checked without import"""
+    missing = [
+        module
+        for module in backend.required_modules
+        if importlib.util.find_spec(module) is None
+    ]
+    if backend.min_sentence_transformers:
+        required = ".".join(map(str, backend.min_sentence_transformers))
+        try:
+            installed = version("sentence-transformers")
+        except PackageNotFoundError:
+            installed = None
+        if installed is None or _release(installed) < backend.min_sentence_transformers:
+            missing.append(f"sentence-transformers>={required}")
+    return missing
+
+
+def _release(installed: str) -> Tuple[int, ...]:
+    """Numeric release parts of a version string, e.g. 3.2.0rc1 -> (3, 2, 0)"""
+    match = re.match(r"\d+(\.\d+)*", installed)
+    return tuple(map(int, match.group().split("."))) if match else ()
+
+
+def check_parity(
+    reference: EmbeddingBackend,
+    candidate: EmbeddingBackend,
+    texts: List[str],
+    k: int = 10
+) -> Dict:
+    """Compare candidate backend with reference embeddings
+
+    Reports per-text cosine similarity, recall@k of nearest neighbours when
+    every text is used as a query against the others, and encode throughput
+    of both backends.
+    """
+    reference.load()
+    candidate.load()
+
+    started = time.perf_counter()
+    expected = np.asarray(reference.encode(texts), dtype="float32")
+    reference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = np.asarray(candidate.encode(texts), dtype="float32")
+    candidate_seconds = time.perf_counter() - started
+
+    cosines = np.sum(expected * actual, axis=1)
+
+    k = min(k, len(texts) - 1)
+    recall = 1.0
+    if k > 0:
+        expected_scores = expected @ expected.T
+        actual_scores = actual @ actual.T
+        np.fill_diagonal(expected_scores, -np.inf)
+        np.fill_diagonal(actual_scores, -np.inf)
+        expected_top = np.argsort(-expected_scores, axis=1)[:, :k]
+        actual_top = np.argsort(-actual_scores, axis=1)[:, :k]
+        hits = sum(
+            len(set(expected_row) & set(actual_row))
+            for expected_row, actual_row in zip(expected_top, actual_top)
+        )
+        recall = hits / expected_top.size
+
+    return {
+        "reference": reference.name,
+        "candidate": candidate.name,
+        "texts": len(texts),
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        f"recall_at_{k}": recall,
+        "reference_texts_per_second": len(texts) / reference_seconds,
+        "candidate_texts_per_second": len(texts) / candidate_seconds
+    }
@@ -1,136 +1,971 @@
-import json
+import asyncio
+import hashlib
 import logging
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import List, Tuple
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.database import AdvisoryLockTimeout, SessionLocal, advisory_lock
+from app.crud.chunk import VECTOR_DTYPE, crud_chunk
+from app.crud.index_operation import crud_index_operation
 from app.models.document import Document
+from app.models.index_operation import REMOVE, UPSERT
+from app.services.batching import EncodeBatcher
+from app.services.chunking import Passage, chunking_service
+from app.services.cluster_service import cluster_service
+from app.services.embedding_backends import check_parity, create_backend
+from app.services.index_cache import IndexCache
+from app.services.index_factory import index_factory
+from app.services.index_store import IndexStore
+from app.services.inference import inference_executor
+from app.services.neighbor_service import neighbor_service
+from app.services.query_cache import QueryCache
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Advisory lock namespace of per-user index builds
+INDEX_BUILD_LOCK = 0x1DB1
+
+# Number of chunks fetched per requested document before max-sim aggregation
+CHUNKS_PER_RESULT = 4
+
+# Columns of the chunk mapping array
+CHUNK_ID, DOCUMENT_ID, START_OFFSET, END_OFFSET = range(4)
+
+
+class IndexBuildPending(Exception):
+    """Index of user is being built by another request"""
+
+    def __init__(self, user_id: int):
+        super().__init__(f"Index for user {user_id} is still being built")
+        self.user_id = user_id
+
+
+@dataclass(frozen=True)
+class UserIndex:
+    """Immutable search index of one user together with its chunk mapping
+
+    ``mapping`` is an int64 array of (chunk_id, document_id, start_offset,
+    end_offset) rows sorted by chunk_id; chunk ids are the FAISS labels.
+    ``version`` names the on-disk snapshot the index was saved as.
+    ``tombstones`` are sorted chunk ids of removed passages still in an
+    index that cannot remove vectors; searches skip them.
+    """
+    user_id: int
+    index: Any
+    mapping: np.ndarray
+    params: Dict = field(default_factory=dict)
+    version: Optional[str] = None
+    tombstones: np.ndarray = field(
+        default_factory=lambda: np.empty(0, dtype="int64")
+    )
+
+    @property
+    def chunk_ids(self) -> np.ndarray:
+        return self.mapping[:, CHUNK_ID]
+
+    @property
+    def document_ids(self) -> np.ndarray:
+        return self.mapping[:, DOCUMENT_ID]
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate memory used by index vectors and mapping"""
+        return (
+            index_factory.estimate_bytes(
+                self.params,
+                self.index.ntotal,
+                self.index.d
+            )
+            + self.mapping.nbytes
+        )
+
+    @cached_property
+    def search_params(self) -> Any:
+        """FAISS search parameters excluding tombstones, None without any"""
+        if len(self.tombstones) == 0:
+            return None
+        return index_factory.search_parameters(self.params, self.tombstones)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search index for (scores, chunk ids), skipping removed passages"""
+        if self.search_params is None:
+            return self.index.search(queries, k)
+        return self.index.search(queries, k, params=self.search_params)
+
+    def lookup(self, chunk_id: int) -> Optional[np.ndarray]:
+        """Get mapping row of chunk"""
+        position = np.searchsorted(self.chunk_ids, chunk_id)
+        if position < len(self.mapping) and self.chunk_ids[position] == chunk_id:
+            return self.mapping[position]
+        return None
+
+
+@dataclass
+class SemanticMatch:
+    """Document found by semantic search with its best matching passages"""
+    document_id: int
+    score: float
+    passages: List[Tuple[int, int, float]] = field(default_factory=list)
+
 
 class EmbeddingService:
     """Service for document embeddings and semantic search"""
 
     def __init__(self):
-        self.model = None
-        self.index = None
-        self.document_ids = []
         self.model_name = "sentence-transformers/all-MiniLM-L6-v2"
+        self.backend = create_backend(settings.EMBEDDING_BACKEND, self.model_name)
+        self.index_cache = IndexCache(settings.INDEX_CACHE_MAX_BYTES)
+        self.index_store = IndexStore("data/indices")
+        self.stale_reloads = 0
+        self.build_wait_timeouts = 0
+        self._builds = SingleFlight()
+        self.query_cache = QueryCache(
+            settings.QUERY_CACHE_MAX_ENTRIES,
+            settings.QUERY_CACHE_TTL_SECONDS
+        )
+        self.query_batcher = EncodeBatcher(
+            self.encode_texts,
+            settings.QUERY_BATCH_MAX_SIZE,
+            settings.QUERY_BATCH_WAIT_MS
+        )
+        self._pending: Dict[int, Dict[int, str]] = {}
+        self._pending_lock = threading.Lock()
+        self._user_locks: Dict[int, threading.Lock] = {}
+        # Snapshot version of each user whose stored queue was last checked
+        self._checked_queues: Dict[int, str] = {}
+        self._update_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="index-updates"
+        )
+
+    @property
+    def model_key(self) -> str:
+        """Model and backend that produced stored and cached vectors"""
+        return self.backend.model_key
 
     def load_model(self):
         """Load embedding model"""
-        if self.model is None:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-        return self.model
+        return self.backend.load()
 
     def create_embeddings(self, texts: List[str]) -> np.ndarray:
         """Create embeddings for list of texts"""
-        model = self.load_model()
-        embeddings = model.encode(texts, normalize_embeddings=True)
-        return embeddings
-
-    def create_index(self, embeddings: np.ndarray):
-        """Create FAISS index for embeddings"""
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)  # Inner Product (cosine similarity)
-        self.index.add(embeddings.astype("float32"))
-
-    def semantic_search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
-        """Perform semantic search for query"""
-        if self.index is None or len(self.document_ids) == 0:
+        return self.backend.encode(texts)
+
+    def check_backend_parity(self, backend_name: str, texts: List[str]) -> dict:
+        """Measure embedding drift and speed of backend against full precision"""
+        return check_parity(
+            create_backend("torch", self.model_name),
+            create_backend(backend_name, self.model_name),
+            texts
+        )
+
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Create embeddings on the inference executor"""
+        return inference_executor.call(self.create_embeddings, texts)
+
+    async def create_embeddings_async(self, texts: List[str]) -> np.ndarray:
+        """Create embeddings without blocking the event loop"""
+        return await inference_executor.run(self.create_embeddings, texts)
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """Get query embedding, skipping inference for repeated queries"""
+        normalized, key = self._query_key(query)
+        query_embedding = self.query_cache.get(key)
+        if query_embedding is None:
+            query_embedding = self.query_batcher.encode(normalized).astype("float32")
+            self.query_cache.put(key, query_embedding)
+        return query_embedding
+
+    async def encode_query_async(self, query: str) -> np.ndarray:
+        """Get query embedding without blocking the event loop"""
+        normalized, key = self._query_key(query)
+        query_embedding = self.query_cache.get(key)
+        if query_embedding is None:
+            # Awaiting the batch future still shares the model call
+            vector = await asyncio.wrap_future(self.query_batcher.submit(normalized))
+            query_embedding = vector.astype("float32")
+            self.query_cache.put(key, query_embedding)
+        return query_embedding
+
+    def _query_key(self, query: str) -> Tuple[str, Tuple[str, str]]:
+        """Normalized query text and its cache key"""
+        # The model is uncased, so case and spacing do not change the vector
+        normalized = " ".join(query.lower().split())
+        return normalized, (self.model_key, normalized)
+
+    def create_index(
+        self,
+        embeddings: np.ndarray,
+        chunk_ids: np.ndarray
+    ) -> Tuple[Any, Dict]:
+        """Create FAISS index for chunk embeddings, labelled by chunk ids
+
+        The index type (exact, HNSW or IVF-PQ) is chosen by corpus size.
+        """
+        return index_factory.build(
+            np.ascontiguousarray(embeddings, dtype="float32"),
+            np.ascontiguousarray(chunk_ids, dtype="int64")
+        )
+
+    def semantic_search(
+        self,
+        user_index: Optional[UserIndex],
+        query: str,
+        k: int = 10
+    ) -> List[SemanticMatch]:
+        """Perform semantic search for query, aggregating chunks by document"""
+        if user_index is None or len(user_index.mapping) == 0:
             return []
+        return self._search_matches(user_index, self.encode_query(query), k)
 
-        model = self.load_model()
-        query_embedding = model.encode([query], normalize_embeddings=True)
+    async def semantic_search_async(
+        self,
+        user_index: Optional[UserIndex],
+        query: str,
+        k: int = 10
+    ) -> List[SemanticMatch]:
+        """Perform semantic search, awaiting the query embedding"""
+        if user_index is None or len(user_index.mapping) == 0:
+            return []
+        query_embedding = await self.encode_query_async(query)
+        return self._search_matches(user_index, query_embedding, k)
 
+    def _search_matches(
+        self,
+        user_index: UserIndex,
+        query_embedding: np.ndarray,
+        k: int
+    ) -> List[SemanticMatch]:
+        """Search index for query embedding, aggregating chunks by document"""
         # Search in index
-        scores, indices = self.index.search(query_embedding.astype("float32"), k)
+        scores, labels = user_index.search(
+            query_embedding,
+            min(k * CHUNKS_PER_RESULT, len(user_index.mapping))
+        )
 
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.document_ids):
-                results.append((self.document_ids[idx], float(score)))
+        # Scores are sorted, so the first chunk of a document is its max-sim
+        matches: Dict[int, SemanticMatch] = {}
+        for score, chunk_id in zip(scores[0], labels[0]):
+            if chunk_id < 0:
+                continue
 
-        return results
+            row = user_index.lookup(chunk_id)
+            if row is None:
+                continue
 
-    def build_index_from_documents(self, db: Session, user_id: int):
-        """Build index from user documents"""
-        documents = db.query(Document).filter(
-            Document.owner_id == user_id,
-            Document.content.isnot(None),
-            Document.content != ""
-        ).all()
+            doc_id = int(row[DOCUMENT_ID])
+            match = matches.get(doc_id)
+            if match is None:
+                if len(matches) >= k:
+                    continue
+                match = matches[doc_id] = SemanticMatch(
+                    document_id=doc_id,
+                    score=float(score)
+                )
+            match.passages.append(
+                (int(row[START_OFFSET]), int(row[END_OFFSET]), float(score))
+            )
+
+        return list(matches.values())
+
+    def get_user_index(self, db: Session, user_id: int) -> Optional[UserIndex]:
+        """Get index for user, building it if it does not exist yet
+
+        Raises IndexBuildPending when another request is still building the
+        index after INDEX_BUILD_WAIT_SECONDS.
+        """
+        wait = settings.INDEX_BUILD_WAIT_SECONDS
+        # The last published index is served until queued changes apply
+        try:
+            self.flush_pending(db, user_id, timeout=wait)
+        except (AdvisoryLockTimeout, FutureTimeoutError):
+            logger.info(f"Index of user {user_id} is busy, changes stay queued")
+        except Exception as e:
+            logger.error(f"Error updating index for user {user_id}: {e}")
+
+        user_index = self.load_index(user_id)
+        if (
+            user_index is not None
+            and self._checked_queues.get(user_id) != user_index.version
+        ):
+            self._checked_queues[user_id] = user_index.version
+            self._restore_pending(db, user_id)
+
+        if user_index is None:
+            try:
+                user_index = self.build_index_from_documents(
+                    db,
+                    user_id,
+                    timeout=wait
+                )
+            except (AdvisoryLockTimeout, FutureTimeoutError):
+                self.build_wait_timeouts += 1
+                raise IndexBuildPending(user_id)
+        return user_index
+
+    def build_index_from_documents(
+        self,
+        db: Session,
+        user_id: int,
+        timeout: Optional[float] = None
+    ) -> Optional[UserIndex]:
+        """Build index from user documents, one build per user at a time
+
+        Concurrent callers in this process share the running build, other
+        processes are serialized with a Postgres advisory lock. With a
+        timeout, callers give up waiting for either after timeout seconds
+        with concurrent.futures.TimeoutError or AdvisoryLockTimeout.
+        """
+        return self._builds.run(
+            user_id,
+            lambda: self._build_exclusively(db, user_id, timeout),
+            timeout
+        )
+
+    def _build_exclusively(
+        self,
+        db: Session,
+        user_id: int,
+        timeout: Optional[float] = None
+    ) -> Optional[UserIndex]:
+        """Build index holding the cross-process build lock of user"""
+        with advisory_lock(INDEX_BUILD_LOCK, user_id, timeout) as was_free:
+            with self._get_user_lock(user_id):
+                if not was_free:
+                    # Another process has just built or updated the index
+                    user_index = self.load_index(user_id)
+                    if user_index is not None:
+                        return user_index
+
+                # Queued changes are covered by the full rebuild below
+                with self._pending_lock:
+                    operations = self._pending.pop(user_id, None)
+
+                try:
+                    stored = crud_index_operation.get_pending(db, user_id)
+                    user_index = self._build_index(db, user_id)
+                except Exception:
+                    if operations:
+                        self._requeue(user_id, operations)
+                    raise
+
+                self._remove_applied(db, user_id, stored)
+                return user_index
+
+    def _build_index(self, db: Session, user_id: int) -> Optional[UserIndex]:
+        """Build, save and cache index, the user lock must be held"""
+        documents = self._query_indexable_documents(db, user_id).all()
 
         if not documents:
             logger.warning(f"No documents with content found for user {user_id}")
-            return
+            self._drop_index(user_id)
+            return None
 
-        texts = []
-        self.document_ids = []
+        logger.info(f"Building index for {len(documents)} documents")
+        mapping, embeddings = self.get_chunk_embeddings(
+            db,
+            user_id,
+            documents,
+            whole_corpus=True
+        )
 
-        for doc in documents:
-            # Combine title and content for better search
-            text = f"{doc.title}. {doc.content}" if doc.content else doc.title
-            texts.append(text)
-            self.document_ids.append(doc.id)
+        if len(mapping) == 0:
+            self._drop_index(user_id)
+            return None
+
+        # UserIndex.lookup expects mapping rows sorted by chunk id
+        order = np.argsort(mapping[:, CHUNK_ID])
+        mapping, embeddings = mapping[order], embeddings[order]
 
-        logger.info(f"Building index for {len(texts)} documents")
-        embeddings = self.create_embeddings(texts)
-        self.create_index(embeddings)
+        index, params = self.create_index(embeddings, mapping[:, CHUNK_ID])
+        user_index = UserIndex(
+            user_id=user_id,
+            index=index,
+            mapping=mapping,
+            params=params
+        )
 
         # Save index
-        self.save_index(user_id)
+        user_index = self.save_index(user_index)
+        self.index_cache.put(user_id, user_index, user_index.size_bytes)
+
+        # The graph searches every passage, so it is built off the locks
+        # and request threads, and searches are served meanwhile
+        self._submit(self._rebuild_neighbors_in_background, user_id)
+        return user_index
+
+    def enqueue_upsert(self, user_id: int, doc_id: int):
+        """Schedule adding or replacing document in user index"""
+        self._enqueue(user_id, doc_id, UPSERT)
+
+    def enqueue_remove(self, user_id: int, doc_id: int):
+        """Schedule removing document from user index"""
+        self._enqueue(user_id, doc_id, REMOVE)
+
+    def _enqueue(self, user_id: int, doc_id: int, operation: str):
+        """Record pending index operation and apply it in background"""
+        with self._pending_lock:
+            self._pending.setdefault(user_id, {})[doc_id] = operation
+        self._submit(self._flush_in_background, user_id)
+
+    def _flush_in_background(self, user_id: int):
+        """Apply pending operations using a dedicated database session"""
+        db = SessionLocal()
+        try:
+            self.flush_pending(db, user_id)
+        except Exception as e:
+            logger.error(f"Error updating index for user {user_id}: {e}")
+        finally:
+            db.close()
+
+    def flush_pending(
+        self,
+        db: Session,
+        user_id: int,
+        timeout: Optional[float] = None
+    ) -> Optional[UserIndex]:
+        """Apply pending add/replace/remove operations to user index
+
+        Operations that fail to apply are queued again, so a later flush
+        retries them instead of leaving the index behind the database.
+        Flushes hold the cross-process build lock of user like builds do:
+        the queue is per process, so patching a version another worker
+        has replaced meanwhile would publish it without that worker's
+        changes. With a timeout, raises AdvisoryLockTimeout or
+        concurrent.futures.TimeoutError when the index stays busy.
+        """
+        with self._pending_lock:
+            if not self._pending.get(user_id):
+                return None
+
+        with advisory_lock(INDEX_BUILD_LOCK, user_id, timeout):
+            with self._get_user_lock(user_id):
+                with self._pending_lock:
+                    operations = self._pending.pop(user_id, None)
+
+                if not operations:
+                    return None
+
+                try:
+                    # Changes queued by other processes or by a crashed one
+                    stored = crud_index_operation.get_pending(db, user_id)
+                    operations.update(
+                        (doc_id, operation)
+                        for doc_id, (operation, _) in stored.items()
+                    )
+
+                    # Loads the version current under the lock
+                    user_index = self.load_index(user_id)
+                    if user_index is None:
+                        # Nothing to patch, the first search builds the index
+                        return None
+
+                    updated = self._apply_operations(db, user_index, operations)
+                    if updated is not None:
+                        user_index = self._publish_update(db, updated, operations)
+                        self._remove_applied(db, user_id, stored)
+                        return user_index
+                except Exception:
+                    db.rollback()
+                    self._requeue(user_id, operations)
+                    raise
+
+                # The full rebuild below covers the operations
+                self._requeue(user_id, operations)
+
+        # Stored vectors make the full rebuild a bulk read, it takes the
+        # locks itself and is shared with concurrent builds
+        user_index = self.build_index_from_documents(db, user_id, timeout)
+        self._assign_clusters(db, user_id, operations)
+        return user_index
+
+    def _publish_update(
+        self,
+        db: Session,
+        updated: UserIndex,
+        operations: Dict[int, str]
+    ) -> UserIndex:
+        """Save and cache patched index, then update neighbours and clusters"""
+        user_id = updated.user_id
+        user_index = self.save_index(updated)
+        self.index_cache.put(user_id, user_index, user_index.size_bytes)
+        if len(user_index.tombstones) > (
+            settings.INDEX_MAX_TOMBSTONE_RATIO * user_index.index.ntotal
+        ):
+            # Searches skip tombstones meanwhile, so rebuilding can wait
+            self._submit(self._rebuild_in_background, user_id)
+
+        try:
+            neighbor_service.update(
+                db,
+                user_id,
+                self.model_key,
+                user_index,
+                [
+                    doc_id for doc_id, operation in operations.items()
+                    if operation == UPSERT
+                ],
+                [
+                    doc_id for doc_id, operation in operations.items()
+                    if operation == REMOVE
+                ]
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error updating neighbour graph for user {user_id}: {e}")
 
-    def save_index(self, user_id: int):
-        """Save index and mapping for user"""
-        if self.index is None:
+        self._assign_clusters(db, user_id, operations)
+        return user_index
+
+    def _assign_clusters(
+        self,
+        db: Session,
+        user_id: int,
+        operations: Dict[int, str]
+    ):
+        """Assign upserted documents to clusters, removals cascade"""
+        try:
+            cluster_service.assign(
+                db,
+                user_id,
+                self.model_key,
+                [
+                    doc_id for doc_id, operation in operations.items()
+                    if operation == UPSERT
+                ]
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error assigning clusters for user {user_id}: {e}")
+
+    def _rebuild_in_background(self, user_id: int):
+        """Rebuild index of user using a dedicated database session"""
+        db = SessionLocal()
+        try:
+            self.build_index_from_documents(db, user_id)
+        except Exception as e:
+            logger.error(f"Error rebuilding index for user {user_id}: {e}")
+        finally:
+            db.close()
+
+    def _rebuild_neighbors_in_background(self, user_id: int):
+        """Rebuild neighbour graph against the current index of user"""
+        db = SessionLocal()
+        try:
+            # Flushes queued before this task may have replaced the index
+            user_index = self.load_index(user_id)
+            if user_index is not None:
+                neighbor_service.rebuild(db, user_id, self.model_key, user_index)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error building neighbour graph for user {user_id}: {e}")
+        finally:
+            db.close()
+
+    def _restore_pending(self, db: Session, user_id: int):
+        """Queue stored operations of user that no process has applied"""
+        try:
+            stored = crud_index_operation.get_pending(db, user_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error reading queued index operations of {user_id}: {e}")
             return
 
-        index_dir = f"data/indices/user_{user_id}"
-        os.makedirs(index_dir, exist_ok=True)
+        if not stored:
+            return
+        logger.info(
+            f"Restoring {len(stored)} queued index operations of user {user_id}"
+        )
+        self._requeue(
+            user_id,
+            {doc_id: operation for doc_id, (operation, _) in stored.items()}
+        )
+        self._submit(self._flush_in_background, user_id)
+
+    def _remove_applied(
+        self,
+        db: Session,
+        user_id: int,
+        stored: Dict[int, Tuple[str, int]]
+    ):
+        """Delete stored operations the published index covers"""
+        try:
+            crud_index_operation.remove_applied(db, stored)
+        except Exception as e:
+            # They are applied once more on a later flush
+            db.rollback()
+            logger.error(f"Error removing applied operations of {user_id}: {e}")
+
+    def _submit(self, fn: Callable, *args):
+        """Run task on the update thread unless the service shuts down"""
+        try:
+            self._update_executor.submit(fn, *args)
+        except RuntimeError as e:
+            # Stored operations are restored by the next process
+            logger.warning(f"Skipped background index task: {e}")
+
+    def shutdown(self):
+        """Finish queued index updates, inference must still be running"""
+        self._update_executor.shutdown(wait=True)
+
+    def _requeue(self, user_id: int, operations: Dict[int, str]):
+        """Put operations back unless newer ones were queued meanwhile"""
+        with self._pending_lock:
+            pending = self._pending.setdefault(user_id, {})
+            for doc_id, operation in operations.items():
+                pending.setdefault(doc_id, operation)
+
+    def _apply_operations(
+        self,
+        db: Session,
+        user_index: UserIndex,
+        operations: Dict[int, str]
+    ) -> Optional[UserIndex]:
+        """Create new index version with only the changed documents encoded
+
+        Indices that cannot remove vectors keep them as tombstones. Returns
+        None when a rebuild is due instead, mostly because the corpus
+        outgrew its index type.
+        """
+        upsert_ids = [
+            doc_id for doc_id, operation in operations.items()
+            if operation == UPSERT
+        ]
+
+        documents = []
+        if upsert_ids:
+            documents = self._query_indexable_documents(
+                db,
+                user_index.user_id
+            ).filter(Document.id.in_(upsert_ids)).all()
+
+        removed = np.isin(
+            user_index.document_ids,
+            np.asarray(list(operations), dtype="int64")
+        )
+
+        new_mapping = np.empty((0, 4), dtype="int64")
+        if documents:
+            new_mapping, embeddings = self.get_chunk_embeddings(
+                db,
+                user_index.user_id,
+                documents
+            )
 
-        # Save FAISS index
-        faiss.write_index(self.index, f"{index_dir}/index.faiss")
+        # Readers keep using the old index, so changes go to a copy
+        index = self._writable_copy(user_index)
+        if index is None:
+            return None
+        tombstones = user_index.tombstones
+        removed_ids = np.ascontiguousarray(user_index.chunk_ids[removed])
+        added = np.ones(len(new_mapping), dtype=bool)
+        if index_factory.supports_remove(user_index.params):
+            if len(removed_ids):
+                index.remove_ids(removed_ids)
+        else:
+            new_ids = new_mapping[:, CHUNK_ID]
+            if np.isin(new_ids, tombstones).any():
+                # A reused chunk id cannot be told apart from its tombstone
+                return None
+            # Unchanged passages keep their chunk id and vector in the graph
+            added = ~np.isin(new_ids, removed_ids)
+            tombstones = np.union1d(
+                tombstones,
+                np.setdiff1d(removed_ids, new_ids)
+            )
+
+        if added.any():
+            index.add_with_ids(
+                np.ascontiguousarray(embeddings[added]),
+                np.ascontiguousarray(new_mapping[added, CHUNK_ID])
+            )
+        mapping = np.vstack([user_index.mapping[~removed], new_mapping])
+
+        if index_factory.needs_rebuild(user_index.params, len(mapping)):
+            return None
+
+        logger.info(
+            f"Applied {len(operations)} index operations for user "
+            f"{user_index.user_id}"
+        )
+        return UserIndex(
+            user_id=user_index.user_id,
+            index=index,
+            mapping=mapping[np.argsort(mapping[:, CHUNK_ID])],
+            params=user_index.params,
+            tombstones=tombstones
+        )
 
-        # Save mapping document_id -> index
-        with open(f"{index_dir}/mapping.json", "w") as f:
-            json.dump({
-                "document_ids": self.document_ids,
+    def _writable_copy(self, user_index: UserIndex) -> Optional[Any]:
+        """Read index of user into memory, None if its snapshot is gone"""
+        if user_index.version is None:
+            import faiss
+
+            return faiss.clone_index(user_index.index)
+
+        try:
+            index = self.index_store.read_writable(
+                user_index.user_id,
+                user_index.version
+            )
+        except (OSError, RuntimeError) as e:
+            logger.warning(
+                f"Could not read index {user_index.version} of user "
+                f"{user_index.user_id}, rebuilding: {e}"
+            )
+            return None
+
+        index_factory.apply_search_params(index, user_index.params)
+        return index
+
+    def get_chunk_embeddings(
+        self,
+        db: Session,
+        user_id: int,
+        documents: List[Document],
+        whole_corpus: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Chunk documents and get passage embeddings
+
+        Stored vectors are reused for unchanged passages, so only passages
+        whose text changed are encoded. Returns the chunk mapping rows and
+        the matching float32 vectors.
+        """
+        # A whole-corpus build reads all user vectors instead of an id list
+        rows, matrix = crud_chunk.get_with_vectors(
+            db,
+            user_id,
+            self.model_key,
+            None if whole_corpus else [doc.id for doc in documents]
+        )
+        stored: Dict[int, List[Tuple[Any, int]]] = {}
+        for position, row in enumerate(rows):
+            stored.setdefault(row.document_id, []).append((row, position))
+
+        mapping_rows: List[Tuple[int, int, int, int]] = []
+        vectors: List[np.ndarray] = []
+        changed = []
+
+        for doc in documents:
+            passages = chunking_service.split(doc.content)
+            texts = [self._chunk_text(doc, passage) for passage in passages]
+            hashes = [self._content_hash(text) for text in texts]
+            existing = stored.get(doc.id, [])
+
+            layout = [
+                (passage.start, passage.end, content_hash)
+                for passage, content_hash in zip(passages, hashes)
+            ]
+            stored_layout = [
+                (row.start_offset, row.end_offset, row.content_hash)
+                for row, _ in existing
+            ]
+            if layout == stored_layout:
+                for row, position in existing:
+                    mapping_rows.append(
+                        (row.id, doc.id, row.start_offset, row.end_offset)
+                    )
+                    vectors.append(matrix[position])
+            else:
+                reusable = {
+                    row.content_hash: matrix[position] for row, position in existing
+                }
+                changed.append((doc, passages, texts, hashes, reusable))
+
+        # Encode all new passage texts in one batch
+        texts_to_encode = []
+        for _, _, texts, hashes, reusable in changed:
+            texts_to_encode.extend(
+                text for text, content_hash in zip(texts, hashes)
+                if content_hash not in reusable
+            )
+        encoded = iter(
+            self.encode_texts(texts_to_encode).astype(VECTOR_DTYPE)
+            if texts_to_encode else []
+        )
+
+        for doc, passages, _, hashes, reusable in changed:
+            records = []
+            for passage, content_hash in zip(passages, hashes):
+                vector = reusable.get(content_hash)
+                if vector is None:
+                    vector = next(encoded)
+                records.append({
+                    "start_offset": passage.start,
+                    "end_offset": passage.end,
+                    "content_hash": content_hash,
+                    "vector": vector.tobytes()
+                })
+                vectors.append(vector)
+
+            chunk_ids = crud_chunk.replace_for_document(
+                db,
+                user_id,
+                doc.id,
+                self.model_key,
+                records
+            )
+            mapping_rows.extend(
+                (chunk_id, doc.id, passage.start, passage.end)
+                for chunk_id, passage in zip(chunk_ids, passages)
+            )
+
+        if changed:
+            db.commit()
+
+        logger.info(
+            f"Encoded {len(texts_to_encode)} passages, reused "
+            f"{len(vectors) - len(texts_to_encode)} stored vectors "
+            f"for user {user_id}"
+        )
+        if not mapping_rows:
+            return np.empty((0, 4), dtype="int64"), np.empty((0, 0), dtype="float32")
+
+        return (
+            np.asarray(mapping_rows, dtype="int64"),
+            np.vstack(vectors).astype("float32")
+        )
+
+    def _get_user_lock(self, user_id: int) -> threading.Lock:
+        """Get lock serializing index writes for user"""
+        with self._pending_lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    @staticmethod
+    def _query_indexable_documents(db: Session, user_id: int):
+        """Query user documents that have content to index"""
+        return db.query(Document).filter(
+            Document.owner_id == user_id,
+            Document.content.isnot(None),
+            Document.content != ""
+        )
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        """Hash of text used to detect changed passages"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _chunk_text(doc: Document, passage: Passage) -> str:
+        """Combine title and passage for better search"""
+        return f"{doc.title}. {doc.content[passage.start:passage.end]}"
+
+    def save_index(self, user_index: UserIndex) -> UserIndex:
+        """Publish index and mapping of user as a new snapshot version"""
+        version = self.index_store.publish(
+            user_index.user_id,
+            user_index.index,
+            user_index.mapping,
+            {
+                "format": "chunks",
+                "index_params": user_index.params,
                 "created_at": datetime.now().isoformat(),
-                "model": self.model_name
-            }, f)
+                "model": self.model_key
+            },
+            user_index.tombstones
+        )
+        self._collect_garbage(user_index.user_id, version)
+        # Queued operations were read when building this version
+        self._checked_queues[user_index.user_id] = version
+        return replace(user_index, version=version)
 
-    def load_index(self, user_id: int) -> bool:
-        """Load index and mapping for user"""
-        index_dir = f"data/indices/user_{user_id}"
-        index_path = f"{index_dir}/index.faiss"
-        mapping_path = f"{index_dir}/mapping.json"
+    def load_index(self, user_id: int) -> Optional[UserIndex]:
+        """Load index and mapping for user
 
-        if not os.path.exists(index_path) or not os.path.exists(mapping_path):
-            return False
+        The FAISS index and the mapping array of the current snapshot are
+        memory-mapped read-only, so worker processes on one host share
+        their pages.
+        """
+        cached = self.index_cache.get(user_id)
+        if cached is not None:
+            # Other workers publish new versions, checking the pointer is
+            # a single small read
+            current = self.index_store.current_version(user_id)
+            if cached.version == current:
+                return cached
+
+            logger.info(
+                f"Index for user {user_id} moved from {cached.version} "
+                f"to {current}, reloading"
+            )
+            self.index_cache.invalidate(user_id)
+            self.stale_reloads += 1
 
         try:
-            self.index = faiss.read_index(index_path)
+            snapshot = self.index_store.open(user_id)
+            if snapshot is None:
+                return None
+            version, index, mapping, tombstones, metadata = snapshot
+
+            if metadata.get("model") != self.model_key:
+                logger.info(
+                    f"Index for user {user_id} was built with "
+                    f"{metadata.get('model')}, rebuilding with {self.model_key}"
+                )
+                return None
 
-            with open(mapping_path) as f:
-                mapping = json.load(f)
-                self.document_ids = mapping["document_ids"]
+            params = metadata.get("index_params", {})
+            index_factory.apply_search_params(index, params)
 
+            user_index = UserIndex(
+                user_id=user_id,
+                index=index,
+                mapping=mapping,
+                params=params,
+                version=version,
+                tombstones=tombstones
+            )
+            self.index_cache.put(user_id, user_index, user_index.size_bytes)
             logger.info(
-                f"Loaded index for user {user_id} "
-                f"with {len(self.document_ids)} documents"
+                f"Loaded index {version} for user {user_id} "
+                f"with {len(user_index.mapping)} passages"
             )
-            return True
+            return user_index
         except Exception as e:
             logger.error(f"Error loading index for user {user_id}: {e}")
-            return False
+            return None
+
+    def _drop_index(self, user_id: int):
+        """Withdraw index of user that has nothing left to index"""
+        self.index_store.unpublish(user_id)
+        self.index_cache.invalidate(user_id)
+
+    def _collect_garbage(self, user_id: int, current: str):
+        """Remove old snapshots of user except the one cached here"""
+        held = {current}
+        cached = self.index_cache.peek(user_id)
+        if cached is not None and cached.version:
+            held.add(cached.version)
+
+        try:
+            self.index_store.collect_garbage(user_id, held)
+        except OSError as e:
+            logger.warning(f"Error removing old indices of user {user_id}: {e}")
+
+    def get_stats(self) -> dict:
+        """Get index cache, index build, query cache and batching counters"""
+        return {
+            "index_cache": {
+                **self.index_cache.stats(),
+                "stale_reloads": self.stale_reloads
+            },
+            "index_builds": {
+                **self._builds.stats(),
+                "wait_timeouts": self.build_wait_timeouts
+            },
+            "query_cache": self.query_cache.stats(),
+            "query_batching": self.query_batcher.stats()
+        }
 
 
 # Global service instance
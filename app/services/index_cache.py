@@ -0,0 +1,82 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IndexCache:
+    """LRU cache of loaded per-user indices bounded by a memory budget"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[int, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Any]:
+        """Get cached index for user and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, user_id: int) -> Optional[Any]:
+        """Get cached index for user without touching recency or counters"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            return entry[0] if entry is not None else None
+
+    def put(self, user_id: int, value: Any, size_bytes: int):
+        """Store index for user, evicting least recently used users if needed"""
+        if size_bytes > self.max_bytes:
+            logger.warning(
+                f"Index for user {user_id} ({size_bytes} bytes) exceeds "
+                f"cache budget of {self.max_bytes} bytes, not caching"
+            )
+            self.invalidate(user_id)
+            return
+
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+
+            while self._entries and self.current_bytes + size_bytes > self.max_bytes:
+                evicted_user_id, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+                logger.info(f"Evicted index for user {evicted_user_id} from cache")
+
+            self._entries[user_id] = (value, size_bytes)
+            self.current_bytes += size_bytes
+
+    def invalidate(self, user_id: int):
+        """Drop cached index for user"""
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
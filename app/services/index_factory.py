@@ -0,0 +1,268 @@
+import logging
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FLAT = "flat"
+HNSW = "hnsw"
+IVFPQ = "ivfpq"
+
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH_CANDIDATES = [16, 32, 64, 128, 256, 512]
+IVF_NPROBE_CANDIDATES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+# Number of sampled queries and neighbours used to measure recall
+TUNING_QUERIES = 200
+TUNING_K = 10
+
+
+class IndexFactory:
+    """Chooses, trains and tunes FAISS index type by corpus size"""
+
+    def __init__(
+        self,
+        flat_max_vectors: int,
+        hnsw_max_vectors: int,
+        recall_target: float
+    ):
+        self.flat_max_vectors = flat_max_vectors
+        self.hnsw_max_vectors = hnsw_max_vectors
+        self.recall_target = recall_target
+
+    def choose_type(self, num_vectors: int) -> str:
+        """Pick index type for number of vectors"""
+        if num_vectors <= self.flat_max_vectors:
+            return FLAT
+        if num_vectors <= self.hnsw_max_vectors:
+            return HNSW
+        return IVFPQ
+
+    def factory_string(
+        self,
+        index_type: str,
+        num_vectors: int,
+        dimension: int
+    ) -> str:
+        """Get faiss.index_factory description for index type"""
+        if index_type == FLAT:
+            return "IDMap2,Flat"
+        if index_type == HNSW:
+            return f"IDMap2,HNSW{HNSW_NEIGHBORS}"
+
+        nlist = self._nlist(num_vectors)
+        return f"IVF{nlist},PQ{self._pq_subquantizers(dimension)}"
+
+    def build(
+        self,
+        vectors: np.ndarray,
+        ids: np.ndarray
+    ) -> Tuple[object, Dict]:
+        """Build, train and tune index for vectors labelled with ids
+
+        PQ compression error can cap IVF-PQ recall below the target at any
+        nprobe, such corpora get an HNSW index instead.
+        """
+        index_type = self.choose_type(len(vectors))
+        index, params = self._build_type(index_type, vectors, ids)
+        if index_type == IVFPQ and params["recall"] < self.recall_target:
+            logger.warning(
+                f"IVF-PQ recall {params['recall']:.3f} is below target "
+                f"{self.recall_target}, building HNSW instead"
+            )
+            index, params = self._build_type(HNSW, vectors, ids)
+            params["fallback_from"] = IVFPQ
+
+        logger.info(f"Built {params['factory']} index with parameters {params}")
+        return index, params
+
+    def _build_type(
+        self,
+        index_type: str,
+        vectors: np.ndarray,
+        ids: np.ndarray
+    ) -> Tuple[object, Dict]:
+        """Build, train and tune index of given type"""
+        import faiss
+
+        num_vectors, dimension = vectors.shape
+        description = self.factory_string(index_type, num_vectors, dimension)
+
+        index = faiss.index_factory(
+            dimension,
+            description,
+            faiss.METRIC_INNER_PRODUCT
+        )
+        if index_type == HNSW:
+            faiss.downcast_index(index.index).hnsw.efConstruction = (
+                HNSW_EF_CONSTRUCTION
+            )
+
+        if not index.is_trained:
+            logger.info(f"Training {description} index on {num_vectors} vectors")
+            index.train(vectors)
+
+        index.add_with_ids(vectors, ids)
+
+        params = {
+            "type": index_type,
+            "factory": description,
+            "search": {},
+            "recall": 1.0
+        }
+        if index_type != FLAT:
+            params["search"], params["recall"] = self._tune(
+                index,
+                index_type,
+                vectors,
+                ids
+            )
+            self.apply_search_params(index, params)
+        return index, params
+
+    def apply_search_params(self, index, params: Dict):
+        """Apply persisted nprobe/efSearch values to index"""
+        import faiss
+
+        parameter_space = faiss.ParameterSpace()
+        for name, value in params.get("search", {}).items():
+            parameter_space.set_index_parameter(index, name, value)
+
+    def search_parameters(self, params: Dict, excluded_ids: np.ndarray):
+        """Search parameters skipping excluded ids, keeping tuned values"""
+        import faiss
+
+        ids = np.ascontiguousarray(excluded_ids, dtype="int64")
+        batch = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+        selector = faiss.IDSelectorNot(batch)
+
+        index_type = params.get("type", FLAT)
+        if index_type == HNSW:
+            search_params = faiss.SearchParametersHNSW()
+        elif index_type == IVFPQ:
+            search_params = faiss.SearchParametersIVF()
+        else:
+            search_params = faiss.SearchParameters()
+        # Parameters passed per search replace those set on the index
+        for name, value in params.get("search", {}).items():
+            setattr(search_params, name, value)
+        search_params.sel = selector
+        # SWIG objects do not keep the selectors they point to alive
+        search_params.referenced_objects = [batch, selector]
+        return search_params
+
+    def needs_rebuild(self, params: Dict, num_vectors: int) -> bool:
+        """Check whether corpus size outgrew the current index type"""
+        index_type = self.choose_type(num_vectors)
+        # Rebuilding would fall back to the current type again
+        if params.get("fallback_from") == index_type:
+            return False
+        return params.get("type", FLAT) != index_type
+
+    @staticmethod
+    def supports_remove(params: Dict) -> bool:
+        """HNSW graphs do not support removing vectors, searches skip them"""
+        return params.get("type", FLAT) != HNSW
+
+    @staticmethod
+    def estimate_bytes(params: Dict, num_vectors: int, dimension: int) -> int:
+        """Approximate memory used by index of given type"""
+        index_type = params.get("type", FLAT)
+        id_bytes = num_vectors * np.dtype("int64").itemsize
+        if index_type == IVFPQ:
+            code_size = IndexFactory._pq_subquantizers(dimension)
+            # Coarse centroids, and 256 centroids per PQ subquantizer
+            nlist = IndexFactory._nlist(num_vectors)
+            centroid_bytes = (nlist + 256) * dimension * 4
+            return num_vectors * code_size + id_bytes + centroid_bytes
+
+        vector_bytes = num_vectors * dimension * np.dtype("float32").itemsize
+        if index_type == HNSW:
+            # Level 0 keeps 2 * M neighbour links per vector
+            vector_bytes += num_vectors * 2 * HNSW_NEIGHBORS * 4
+        return vector_bytes + id_bytes
+
+    def _tune(
+        self,
+        index,
+        index_type: str,
+        vectors: np.ndarray,
+        ids: np.ndarray
+    ) -> Tuple[Dict[str, int], float]:
+        """Find cheapest search parameter reaching the recall target"""
+        import faiss
+
+        rng = np.random.default_rng(0)
+        sample = rng.choice(
+            len(vectors),
+            size=min(TUNING_QUERIES, len(vectors)),
+            replace=False
+        )
+        queries = vectors[sample]
+
+        exact = faiss.IndexFlatIP(vectors.shape[1])
+        exact.add(vectors)
+        _, positions = exact.search(queries, TUNING_K)
+        expected = ids[positions]
+
+        name, candidates = self._tuning_candidates(index, index_type)
+        parameter_space = faiss.ParameterSpace()
+        recall = 0.0
+        for value in candidates:
+            parameter_space.set_index_parameter(index, name, value)
+            _, found = index.search(queries, TUNING_K)
+            recall = self._recall(expected, found)
+            if recall >= self.recall_target:
+                return {name: value}, recall
+
+        logger.warning(
+            f"Recall target {self.recall_target} not reached, "
+            f"using {name}={candidates[-1]} with recall {recall:.3f}"
+        )
+        return {name: candidates[-1]}, recall
+
+    @staticmethod
+    def _tuning_candidates(index, index_type: str) -> Tuple[str, List[int]]:
+        """Get tuned parameter name and values to try"""
+        import faiss
+
+        if index_type == HNSW:
+            return "efSearch", HNSW_EF_SEARCH_CANDIDATES
+
+        nlist = faiss.extract_index_ivf(index).nlist
+        return "nprobe", [n for n in IVF_NPROBE_CANDIDATES if n <= nlist] or [nlist]
+
+    @staticmethod
+    def _recall(expected: np.ndarray, found: np.ndarray) -> float:
+        """Fraction of exact neighbours returned by approximate search"""
+        hits = sum(
+            len(set(expected_row) & set(found_row))
+            for expected_row, found_row in zip(expected, found)
+        )
+        return hits / expected.size
+
+    @staticmethod
+    def _nlist(num_vectors: int) -> int:
+        """Number of IVF lists, about 4 * sqrt(n) is the usual choice"""
+        return max(1, min(65536, int(4 * math.sqrt(num_vectors))))
+
+    @staticmethod
+    def _pq_subquantizers(dimension: int) -> int:
+        """Largest PQ code size up to dimension / 8 that divides dimension"""
+        for m in range(max(1, dimension // 8), 0, -1):
+            if dimension % m == 0:
+                return m
+        return 1
+
+
+# Global factory instance
+index_factory = IndexFactory(
+    settings.INDEX_FLAT_MAX_VECTORS,
+    settings.INDEX_HNSW_MAX_VECTORS,
+    settings.INDEX_RECALL_TARGET
+)
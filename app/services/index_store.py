@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Storage format of the chunk mapping file next to the FAISS index
+MAPPING_DTYPE = np.dtype("<i8")
+
+CURRENT_FILE = "CURRENT"
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+STAGING_PREFIX = ".staging-"
+# Staging directories older than this are left over from crashed writers
+STAGING_MAX_AGE_SECONDS = 3600
+
+
+class IndexStore:
+    """Versioned on-disk snapshots of per-user indices
+
+    Every save writes index.faiss, mapping.bin, tombstones.bin and
+    mapping.json into a new immutable ``v<N>`` directory and then
+    atomically replaces the ``CURRENT`` pointer file, so readers always
+    open a consistent (index, mapping) pair. Old versions are removed once
+    they are neither current, among the newest ``keep_versions``, nor held
+    by this process. Other processes may still have a removed version
+    memory-mapped, which is safe on POSIX where unlinked files stay
+    readable while mapped; where deletion fails the version is retried on
+    the next collection.
+    """
+
+    def __init__(self, root: str, keep_versions: int = 2):
+        self.root = root
+        self.keep_versions = keep_versions
+
+    def user_dir(self, user_id: int) -> str:
+        return os.path.join(self.root, f"user_{user_id}")
+
+    def current_version(self, user_id: int) -> Optional[str]:
+        """Read version the CURRENT pointer refers to"""
+        try:
+            with open(os.path.join(self.user_dir(user_id), CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(
+        self,
+        user_id: int,
+        index: Any,
+        mapping: np.ndarray,
+        metadata: Dict,
+        tombstones: Optional[np.ndarray] = None
+    ) -> str:
+        """Write snapshot and make it current, returns its version
+
+        ``tombstones`` are ids still in the index that searches must skip.
+        """
+        import faiss
+
+        user_dir = self.user_dir(user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=user_dir)
+
+        try:
+            faiss.write_index(index, os.path.join(staging_dir, "index.faiss"))
+
+            mapping = np.ascontiguousarray(mapping, dtype=MAPPING_DTYPE)
+            mapping.tofile(os.path.join(staging_dir, "mapping.bin"))
+
+            if tombstones is None:
+                tombstones = np.empty(0, dtype=MAPPING_DTYPE)
+            tombstones = np.ascontiguousarray(tombstones, dtype=MAPPING_DTYPE)
+            tombstones.tofile(os.path.join(staging_dir, "tombstones.bin"))
+
+            with open(os.path.join(staging_dir, "mapping.json"), "w") as f:
+                json.dump({
+                    **metadata,
+                    "mapping_file": "mapping.bin",
+                    "mapping_rows": len(mapping),
+                    "tombstones_file": "tombstones.bin",
+                    "tombstone_rows": len(tombstones)
+                }, f)
+
+            version = self._rename_to_next_version(user_dir, staging_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        # Atomically point readers at the new snapshot
+        pointer_fd, pointer_tmp = tempfile.mkstemp(
+            prefix=f"{CURRENT_FILE}.",
+            suffix=".tmp",
+            dir=user_dir
+        )
+        with os.fdopen(pointer_fd, "w") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(user_dir, CURRENT_FILE))
+
+        logger.info(f"Published index snapshot {version} for user {user_id}")
+        return version
+
+    def unpublish(self, user_id: int):
+        """Remove CURRENT pointer so no version of user is served"""
+        try:
+            os.remove(os.path.join(self.user_dir(user_id), CURRENT_FILE))
+        except FileNotFoundError:
+            pass
+
+    def open(
+        self,
+        user_id: int
+    ) -> Optional[Tuple[str, Any, np.ndarray, np.ndarray, Dict]]:
+        """Open current snapshot as (version, index, mapping, tombstones, metadata)"""
+        # A second attempt covers a snapshot collected right after the
+        # pointer was read
+        for _ in range(2):
+            version = self.current_version(user_id)
+            if version is None:
+                return None
+
+            try:
+                return (version, *self._open_snapshot(user_id, version))
+            except FileNotFoundError:
+                logger.info(f"Snapshot {version} of user {user_id} disappeared")
+
+        return None
+
+    def read_writable(self, user_id: int, version: str):
+        """Read index of snapshot fully into memory so it can be modified
+
+        Memory-mapped indices are read-only, and FAISS cannot clone IVF
+        indices whose inverted lists were mapped from disk.
+        """
+        import faiss
+
+        index_path = os.path.join(self.user_dir(user_id), version, "index.faiss")
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(index_path)
+        return faiss.read_index(index_path)
+
+    def collect_garbage(self, user_id: int, held: Iterable[str] = ()):
+        """Remove snapshots that are old and not held by this process"""
+        user_dir = self.user_dir(user_id)
+        versions = self._list_versions(user_dir)
+        keep = set(held) | set(versions[-self.keep_versions:])
+        current = self.current_version(user_id)
+        if current:
+            keep.add(current)
+
+        for version in versions:
+            if version not in keep:
+                shutil.rmtree(
+                    os.path.join(user_dir, version),
+                    ignore_errors=True
+                )
+
+        now = time.time()
+        for name in os.listdir(user_dir):
+            path = os.path.join(user_dir, name)
+            # Versions published since the listing above are kept as well
+            if name == CURRENT_FILE or VERSION_PATTERN.match(name):
+                continue
+            if name.startswith(STAGING_PREFIX) or name.endswith(".tmp"):
+                if now - os.path.getmtime(path) < STAGING_MAX_AGE_SECONDS:
+                    continue
+            # Leftovers of writers that crashed, or unversioned legacy files
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.info(f"Could not remove {path}: {e}")
+
+    def _open_snapshot(
+        self,
+        user_id: int,
+        version: str
+    ) -> Tuple[Any, np.ndarray, np.ndarray, Dict]:
+        """Open index and mapping of snapshot memory-mapped"""
+        snapshot_dir = os.path.join(self.user_dir(user_id), version)
+        with open(os.path.join(snapshot_dir, "mapping.json")) as f:
+            metadata = json.load(f)
+
+        rows = metadata["mapping_rows"]
+        if rows:
+            mapping = np.memmap(
+                os.path.join(snapshot_dir, metadata["mapping_file"]),
+                dtype=MAPPING_DTYPE,
+                mode="r",
+                shape=(rows, 4)
+            )
+        else:
+            mapping = np.empty((0, 4), dtype=MAPPING_DTYPE)
+
+        # Snapshots written before tombstones were kept have none
+        tombstones = np.empty(0, dtype=MAPPING_DTYPE)
+        if metadata.get("tombstone_rows"):
+            tombstones = np.fromfile(
+                os.path.join(snapshot_dir, metadata["tombstones_file"]),
+                dtype=MAPPING_DTYPE
+            )
+
+        index_path = os.path.join(snapshot_dir, "index.faiss")
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(index_path)
+        return self._read_index(index_path), mapping, tombstones, metadata
+
+    @staticmethod
+    def _read_index(index_path: str):
+        """Open FAISS index memory-mapped, reading it into RAM as a fallback"""
+        import faiss
+
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        # Newer FAISS versions can also map flat vector storage
+        flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        try:
+            return faiss.read_index(index_path, flags)
+        except RuntimeError as e:
+            logger.info(f"Memory-mapping {index_path} failed, reading it: {e}")
+            return faiss.read_index(index_path)
+
+    def _rename_to_next_version(self, user_dir: str, staging_dir: str) -> str:
+        """Move staging directory to the next free version number"""
+        versions = self._list_versions(user_dir)
+        number = 1
+        if versions:
+            number = int(VERSION_PATTERN.match(versions[-1]).group(1)) + 1
+
+        while True:
+            version = f"v{number:010d}"
+            target = os.path.join(user_dir, version)
+            try:
+                # Fails if another process already published this version
+                os.rename(staging_dir, target)
+                return version
+            except OSError:
+                if not os.path.isdir(target):
+                    raise
+                number += 1
+
+    @staticmethod
+    def _list_versions(user_dir: str) -> List[str]:
+        """Snapshot versions of user, oldest first"""
+        if not os.path.isdir(user_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(user_dir) if VERSION_PATTERN.match(name)
+        )
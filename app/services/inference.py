@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """Dedicated worker threads for model inference
+
+    Models are loaded and run on these threads only, so the event loop and
+    the request threadpool never block on transformer calls. PyTorch releases
+    the GIL during inference, so threads avoid the model copies and start-up
+    cost of a process pool.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="inference"
+        )
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue model call and return its future"""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run model call on inference threads and wait for the result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run model call on inference threads without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self):
+        """Stop accepting work and wait for running calls"""
+        self._executor.shutdown(wait=True)
+
+
+# Global executor instance
+inference_executor = InferenceExecutor(settings.INFERENCE_WORKERS)
@@ -0,0 +1,328 @@
+import logging
+import math
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.crud.keyword import crud_document_keyword, crud_keyword_model
+from app.models.document import Document
+from app.models.keyword import KeywordModel
+
+logger = logging.getLogger(__name__)
+
+# Keywords stored per document for similarity lookups
+KEYWORDS_PER_DOCUMENT = 10
+
+# Documents analyzed per batch when fitting a model
+FIT_BATCH_SIZE = 200
+
+STOP_WORDS = [
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to",
+    "for", "of", "with", "by", "это", "как", "так", "и", "в", "над",
+    "к", "до", "не", "на", "но", "за", "то", "с", "ли", "а", "во",
+    "от", "со", "для", "о", "же", "ну", "вы", "бы", "что", "кто",
+    "он", "она"
+]
+
+
+def document_text(title: Optional[str], content: Optional[str]) -> str:
+    """Text of document the keyword model is counted over"""
+    return "\n".join(part for part in (title, content) if part)
+
+
+class KeywordService:
+    """Keyword extraction with a per-user TF-IDF model
+
+    Document frequencies of unigrams and bigrams are stored per user and
+    updated as documents are created, changed and deleted, so extraction
+    is a sparse TF-IDF transform against the user's corpus. Updates and
+    first fits run on a background thread in commit order, off request
+    threads and the event loop.
+    """
+
+    def __init__(self):
+        self._analyzer: Optional[Callable[[str], List[str]]] = None
+        self._lock = threading.Lock()
+        self._update_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="keyword-updates"
+        )
+
+    def analyze(self, text: str) -> Counter:
+        """Count unigram and bigram terms of text"""
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    from sklearn.feature_extraction.text import CountVectorizer
+
+                    self._analyzer = CountVectorizer(
+                        stop_words=STOP_WORDS,
+                        ngram_range=(1, 2)
+                    ).build_analyzer()
+        return Counter(self._analyzer(text)) if text else Counter()
+
+    def fit(self, db: Session, owner_id: int):
+        """Count document frequencies and index keywords of owner documents"""
+        counts: Counter = Counter()
+        document_count = 0
+        for _, title, content in self._query_documents(db, owner_id):
+            counts.update(self.analyze(document_text(title, content)).keys())
+            document_count += 1
+
+        crud_keyword_model.replace(db, owner_id, counts, document_count)
+
+        # Second pass scores keywords against the complete statistics
+        batch = []
+        for row in self._query_documents(db, owner_id):
+            batch.append(row)
+            if len(batch) == FIT_BATCH_SIZE:
+                self._index_documents(db, owner_id, batch)
+                batch = []
+        self._index_documents(db, owner_id, batch)
+
+        db.commit()
+        logger.info(
+            f"Fitted keyword model for user {owner_id} on {document_count} "
+            f"documents with {len(counts)} terms"
+        )
+
+    def ensure_fitted(self, db: Session, owner_id: int) -> KeywordModel:
+        """Get keyword model of owner, fitting it on first use"""
+        model = crud_keyword_model.get_model(db, owner_id)
+        if model is None:
+            self.fit(db, owner_id)
+            model = crud_keyword_model.get_model(db, owner_id)
+        return model
+
+    def enqueue_update(
+        self,
+        owner_id: int,
+        document_id: int,
+        old_text: Optional[str],
+        new_text: Optional[str]
+    ):
+        """Schedule applying committed document change to keyword model"""
+        self._update_executor.submit(
+            self._update_in_background,
+            owner_id,
+            document_id,
+            old_text,
+            new_text
+        )
+
+    def shutdown(self):
+        """Finish queued keyword model updates"""
+        self._update_executor.shutdown(wait=True)
+
+    def _update_in_background(
+        self,
+        owner_id: int,
+        document_id: int,
+        old_text: Optional[str],
+        new_text: Optional[str]
+    ):
+        """Apply document change using a dedicated database session"""
+        db = SessionLocal()
+        try:
+            self.update_document(db, owner_id, document_id, old_text, new_text)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error updating keyword model for user {owner_id}: {e}")
+        finally:
+            db.close()
+
+    def _fit_in_background(self, owner_id: int):
+        """Fit keyword model of owner unless a queued update did already"""
+        db = SessionLocal()
+        try:
+            if crud_keyword_model.get_model(db, owner_id) is None:
+                self.fit(db, owner_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error fitting keyword model for user {owner_id}: {e}")
+        finally:
+            db.close()
+
+    def update_document(
+        self,
+        db: Session,
+        owner_id: int,
+        document_id: int,
+        old_text: Optional[str],
+        new_text: Optional[str]
+    ):
+        """Apply committed create (no old text), update or delete (no new text)"""
+        if crud_keyword_model.get_model(db, owner_id) is None:
+            # The first fit counts the committed change as well
+            self.fit(db, owner_id)
+            return
+
+        old_terms = set(self.analyze(old_text or ""))
+        new_terms = set(self.analyze(new_text or ""))
+        deltas = dict.fromkeys(new_terms - old_terms, 1)
+        deltas.update(dict.fromkeys(old_terms - new_terms, -1))
+        document_delta = (new_text is not None) - (old_text is not None)
+
+        crud_keyword_model.apply_deltas(db, owner_id, deltas, document_delta)
+        if new_text is not None:
+            # Keywords of deleted documents go with them by cascade
+            crud_document_keyword.replace_for_documents(
+                db,
+                owner_id,
+                {
+                    document_id: self.score_batch(
+                        db,
+                        owner_id,
+                        [new_text],
+                        KEYWORDS_PER_DOCUMENT
+                    )[0]
+                }
+            )
+        db.commit()
+
+    def find_similar(
+        self,
+        db: Session,
+        owner_id: int,
+        document_id: int,
+        top_k: int = 5
+    ) -> List[Tuple[int, float]]:
+        """Documents most similar by Jaccard index of their stored keywords
+
+        Only documents sharing a keyword, found in the keyword postings,
+        are scored. Until the first fit of owner is done in background,
+        nothing is found.
+        """
+        if crud_keyword_model.get_model(db, owner_id) is None:
+            self._update_executor.submit(self._fit_in_background, owner_id)
+            return []
+        keywords = crud_document_keyword.get_keywords(db, document_id)
+        shared = crud_document_keyword.count_shared(
+            db,
+            owner_id,
+            keywords,
+            document_id
+        )
+        sizes = crud_document_keyword.count_keywords(db, list(shared))
+
+        scored = [
+            (candidate_id, count / (len(keywords) + sizes[candidate_id] - count))
+            for candidate_id, count in shared.items()
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:top_k]
+
+    def score_batch(
+        self,
+        db: Session,
+        owner_id: int,
+        texts: List[str],
+        num_keywords: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        """Top TF-IDF terms with scores of many texts in one sparse pass
+
+        Until the first fit of owner is done in background, texts are scored
+        against an empty corpus, i.e. by term frequency.
+        """
+        from scipy.sparse import csr_matrix
+
+        model = crud_keyword_model.get_model(db, owner_id)
+        if model is None:
+            self._update_executor.submit(self._fit_in_background, owner_id)
+
+        term_counts = [self.analyze(text) for text in texts]
+        vocabulary: Dict[str, int] = {}
+        rows, columns, values = [], [], []
+        for row, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(count)
+
+        if not vocabulary:
+            return [[] for _ in texts]
+
+        terms = np.array(list(vocabulary), dtype=object)
+        frequencies, document_count = {}, 0
+        if model is not None:
+            frequencies = crud_keyword_model.get_document_counts(db, owner_id, terms)
+            document_count = model.document_count
+        # Smoothed IDF as in scikit-learn, unseen terms count as rare
+        idf = np.array([
+            math.log((1 + document_count) / (1 + frequencies.get(term, 0))) + 1
+            for term in terms
+        ])
+
+        tf = csr_matrix(
+            (np.asarray(values, dtype=np.float64), (rows, columns)),
+            shape=(len(texts), len(vocabulary))
+        )
+        tfidf = tf.multiply(idf).tocsr()
+
+        # Scores are L2-normalized per text like TfidfVectorizer output
+        results = []
+        for row in range(len(texts)):
+            start, end = tfidf.indptr[row], tfidf.indptr[row + 1]
+            scores = tfidf.data[start:end]
+            top = np.argsort(-scores, kind="stable")[:num_keywords]
+            norm = np.linalg.norm(scores) or 1.0
+            results.append([
+                (terms[tfidf.indices[start + i]], float(scores[i] / norm))
+                for i in top
+            ])
+        return results
+
+    def extract_batch(
+        self,
+        db: Session,
+        owner_id: int,
+        texts: List[str],
+        num_keywords: int = 5
+    ) -> List[List[str]]:
+        """Top keywords of many texts of owner"""
+        return [
+            [term for term, _ in scored]
+            for scored in self.score_batch(db, owner_id, texts, num_keywords)
+        ]
+
+    def extract(
+        self,
+        db: Session,
+        owner_id: int,
+        text: str,
+        num_keywords: int = 5
+    ) -> List[str]:
+        """Top keywords of text against the corpus of owner"""
+        return self.extract_batch(db, owner_id, [text], num_keywords)[0]
+
+    def _index_documents(self, db: Session, owner_id: int, rows: List):
+        """Store keywords of (id, title, content) document rows"""
+        if not rows:
+            return
+
+        scored = self.score_batch(
+            db,
+            owner_id,
+            [document_text(title, content) for _, title, content in rows],
+            KEYWORDS_PER_DOCUMENT
+        )
+        crud_document_keyword.replace_for_documents(
+            db,
+            owner_id,
+            {row[0]: keywords for row, keywords in zip(rows, scored)}
+        )
+
+    @staticmethod
+    def _query_documents(db: Session, owner_id: int):
+        return db.query(Document.id, Document.title, Document.content).filter(
+            Document.owner_id == owner_id
+        ).order_by(Document.id).yield_per(FIT_BATCH_SIZE)
+
+
+# Global service instance
+keyword_service = KeywordService()
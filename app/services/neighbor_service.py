@@ -0,0 +1,187 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.crud.chunk import crud_chunk
+from app.crud.neighbor import crud_neighbor
+
+logger = logging.getLogger(__name__)
+
+# Neighbours stored per document
+NEIGHBORS_PER_DOCUMENT = 10
+
+# Chunks fetched per searched chunk and neighbour, nearby chunks of the
+# searched document itself come back first
+CHUNKS_PER_NEIGHBOR = 4
+
+
+class NeighborService:
+    """Materialized k-nearest-neighbour graph of user documents
+
+    Two documents are as similar as their closest pair of passages, the
+    same max-sim aggregation semantic search uses. Neighbours are found by
+    batch searching all passages of a document in the user's chunk index,
+    passed as the UserIndex so removed chunks are skipped.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+
+    def rebuild(
+        self,
+        db: Session,
+        owner_id: int,
+        model_key: str,
+        user_index: Any
+    ):
+        """Compute neighbours of all documents from their stored vectors"""
+        candidates = self._search_documents(
+            db,
+            owner_id,
+            model_key,
+            user_index,
+            None
+        )
+        crud_neighbor.replace_for_owner(
+            db,
+            owner_id,
+            {doc_id: found[:self.k] for doc_id, found in candidates.items()}
+        )
+        db.commit()
+        logger.info(
+            f"Built neighbour graph of {len(candidates)} documents "
+            f"for user {owner_id}"
+        )
+
+    def update(
+        self,
+        db: Session,
+        owner_id: int,
+        model_key: str,
+        user_index: Any,
+        changed_ids: Iterable[int],
+        removed_ids: Iterable[int]
+    ):
+        """Recompute neighbours of changed documents and those they affect"""
+        changed_ids = set(changed_ids)
+        removed_ids = set(removed_ids)
+
+        neighbors = self._search_documents(
+            db,
+            owner_id,
+            model_key,
+            user_index,
+            changed_ids
+        )
+
+        # Documents listing a changed document hold a stale score, others
+        # may now rank a changed document above their current last entry
+        affected = crud_neighbor.get_referrers(db, changed_ids | removed_ids)
+        scores = {}
+        for doc_id in changed_ids:
+            for neighbor_id, score in neighbors.get(doc_id, []):
+                scores[neighbor_id] = max(score, scores.get(neighbor_id, score))
+        thresholds = crud_neighbor.get_thresholds(db, scores)
+        affected.update(
+            neighbor_id for neighbor_id, score in scores.items()
+            if neighbor_id not in thresholds
+            or thresholds[neighbor_id][0] < self.k
+            or score > thresholds[neighbor_id][1]
+        )
+        affected -= changed_ids | removed_ids
+
+        neighbors.update(self._search_documents(
+            db,
+            owner_id,
+            model_key,
+            user_index,
+            affected
+        ))
+        crud_neighbor.replace_for_documents(
+            db,
+            owner_id,
+            {
+                doc_id: neighbors.get(doc_id, [])[:self.k]
+                for doc_id in (changed_ids | affected) - removed_ids
+            }
+        )
+        db.commit()
+
+    def _search_documents(
+        self,
+        db: Session,
+        owner_id: int,
+        model_key: str,
+        user_index: Any,
+        query_ids: Optional[Iterable[int]]
+    ) -> Dict[int, List[Tuple[int, float]]]:
+        """Search neighbour candidates of documents, all without query_ids"""
+        if query_ids is not None:
+            query_ids = list(query_ids)
+            if not query_ids:
+                return {}
+
+        rows, vectors = crud_chunk.get_with_vectors(
+            db,
+            owner_id,
+            model_key,
+            query_ids
+        )
+        if not rows:
+            return {}
+
+        return self._search(
+            user_index,
+            np.array([row.document_id for row in rows], dtype="int64"),
+            vectors
+        )
+
+    def _search(
+        self,
+        user_index: Any,
+        query_document_ids: np.ndarray,
+        vectors: np.ndarray
+    ) -> Dict[int, List[Tuple[int, float]]]:
+        """Batch search chunks and rank other documents by best chunk score
+
+        Returns candidates of every queried document, most similar first.
+        """
+        chunk_ids, document_ids = user_index.chunk_ids, user_index.document_ids
+        candidates = {int(doc_id): [] for doc_id in np.unique(query_document_ids)}
+        if len(chunk_ids) == 0 or len(vectors) == 0:
+            return candidates
+
+        fetch = min(len(chunk_ids), (self.k + 1) * CHUNKS_PER_NEIGHBOR)
+        scores, labels = user_index.search(
+            np.ascontiguousarray(vectors, dtype="float32"),
+            fetch
+        )
+
+        positions = np.clip(np.searchsorted(chunk_ids, labels), 0, len(chunk_ids) - 1)
+        valid = (labels >= 0) & (chunk_ids[positions] == labels)
+        queried = np.repeat(query_document_ids, fetch)
+        found = document_ids[positions].ravel()
+        keep = valid.ravel() & (found != queried)
+        queried, found, scores = queried[keep], found[keep], scores.ravel()[keep]
+
+        # Best score per (document, neighbour) pair
+        order = np.lexsort((-scores, found, queried))
+        queried, found, scores = queried[order], found[order], scores[order]
+        first = np.ones(len(queried), dtype=bool)
+        first[1:] = (queried[1:] != queried[:-1]) | (found[1:] != found[:-1])
+        queried, found, scores = queried[first], found[first], scores[first]
+
+        order = np.lexsort((-scores, queried))
+        for doc_id, neighbor_id, score in zip(
+            queried[order],
+            found[order],
+            scores[order]
+        ):
+            candidates[int(doc_id)].append((int(neighbor_id), float(score)))
+        return candidates
+
+
+# Global service instance
+neighbor_service = NeighborService(NEIGHBORS_PER_DOCUMENT)
@@ -0,0 +1,116 @@
+import logging
+import threading
+from typing import Callable, Dict, List
+
+from app.core.config import settings
+from app.services.inference import inference_executor
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Long enough for the summarizer to run a real generation pass
+WARMUP_TEXT = (
+    "The knowledge base stores documents uploaded by users. "
+    "Documents are split into passages, embedded and indexed for semantic "
+    "search. Summaries and keywords are generated when a document is added. "
+) * 2
+
+
+def _warm_embedding():
+    """Load embedding model and run a dummy encode"""
+    from app.services.embedding_service import embedding_service
+
+    embedding_service.load_model()
+    embedding_service.create_embeddings([WARMUP_TEXT])
+
+
+def _warm_summarizer():
+    """Load summarization pipeline and run a dummy summary"""
+    from app.services.ai_service import ai_service
+
+    if ai_service.load_summarizer() is None:
+        raise RuntimeError("Summarization model is not available")
+    ai_service.summarize_text(WARMUP_TEXT, max_length=30, min_length=5)
+
+
+WARMERS: Dict[str, Callable[[], None]] = {
+    "embedding": _warm_embedding,
+    "summarizer": _warm_summarizer,
+}
+
+# Models whose callers fall back when they failed to load, e.g. the
+# summarizer to extractive summaries. Semantic search has no fallback.
+OPTIONAL_MODELS = {"summarizer"}
+
+
+class ModelPrewarmer:
+    """Loads selected models in background and tracks readiness"""
+
+    def __init__(self, models: List[str]):
+        unknown = [model for model in models if model not in WARMERS]
+        if unknown:
+            logger.warning(f"Unknown models to prewarm ignored: {unknown}")
+
+        self.models = [model for model in models if model in WARMERS]
+        self.status: Dict[str, str] = dict.fromkeys(self.models, PENDING)
+        self.errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Warm up models on the inference executor"""
+        for model in self.models:
+            inference_executor.submit(self._warm, model)
+
+    def _warm(self, model: str):
+        """Load and warm up one model"""
+        self._set_status(model, LOADING)
+        try:
+            logger.info(f"Prewarming {model} model")
+            WARMERS[model]()
+            self._set_status(model, READY)
+            logger.info(f"Model {model} is warm")
+        except Exception as e:
+            logger.error(f"Error prewarming {model} model: {e}")
+            with self._lock:
+                self.errors[model] = str(e)
+            self._set_status(model, FAILED)
+
+    def _set_status(self, model: str, status: str):
+        with self._lock:
+            self.status[model] = status
+
+    @property
+    def ready(self) -> bool:
+        """All selected models loaded, or failed with a fallback"""
+        with self._lock:
+            return self._state() == READY
+
+    def report(self) -> Dict:
+        """Get readiness report"""
+        with self._lock:
+            return {
+                "status": "warming" if self._state() == LOADING else self._state(),
+                "models": dict(self.status),
+                "errors": dict(self.errors)
+            }
+
+    def _state(self) -> str:
+        """Overall state, FAILED once a model without fallback failed"""
+        if any(
+            status == FAILED and model not in OPTIONAL_MODELS
+            for model, status in self.status.items()
+        ):
+            return FAILED
+        if all(status in (READY, FAILED) for status in self.status.values()):
+            return READY
+        return LOADING
+
+
+# Global prewarmer instance
+model_prewarmer = ModelPrewarmer(
+    [model.strip() for model in settings.PREWARM_MODELS.split(",") if model.strip()]
+)
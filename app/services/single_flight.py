@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution
+
+    The first caller runs the function, callers arriving while it runs wait
+    for its result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        key: Hashable,
+        function: Callable[[], Any],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run function once per key at a time, sharing result with waiters
+
+        Waiters raise concurrent.futures.TimeoutError after timeout seconds,
+        the running call itself is not interrupted.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result(timeout)
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Check whether a call for key is running"""
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> Dict:
+        """Get running and coalesced call counters"""
+        with self._lock:
+            return {"in_flight": len(self._calls), "coalesced": self.coalesced}
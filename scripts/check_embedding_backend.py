@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.core.database import SessionLocal
+from app.models.document import Document
+from app.services.embedding_service import embedding_service
+
+
+def load_sample_texts(limit: int):
+    """Load document texts to compare embeddings on"""
+    db = SessionLocal()
+    try:
+        documents = db.query(Document.title, Document.content).filter(
+            Document.content.isnot(None),
+            Document.content != ""
+        ).limit(limit).all()
+        return [f"{title}. {content[:1000]}" for title, content in documents]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare an embedding backend with full-precision PyTorch"
+    )
+    parser.add_argument("backend", help="Backend to check: int8 or onnx")
+    parser.add_argument("--limit", type=int, default=500, help="Number of documents")
+    args = parser.parse_args()
+
+    texts = load_sample_texts(args.limit)
+    if len(texts) < 2:
+        print("Need at least 2 documents with content to compare backends")
+        return False
+
+    report = embedding_service.check_backend_parity(args.backend, texts)
+    print(json.dumps(report, indent=2))
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = main()
+        sys.exit(0 if success else 1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.batching import EncodeBatcher  # noqa: E402
+
+
+class RecordingEncoder:
+    """Encodes a text as [len(text)] and records every batch"""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return np.array([[len(text)] for text in texts], dtype="float32")
+
+
+def encode_concurrently(batcher, texts):
+    with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+        futures = [executor.submit(batcher.encode, text) for text in texts]
+        return [future.result(5) for future in futures]
+
+
+def test_concurrent_requests_share_one_batch():
+    encoder = RecordingEncoder()
+    # A full batch is encoded without waiting for the deadline
+    batcher = EncodeBatcher(encoder, max_batch_size=4, max_wait_ms=5000)
+
+    vectors = encode_concurrently(batcher, ["a", "bb", "ccc", "dddd"])
+
+    assert [vector.tolist() for vector in vectors] == [[[1]], [[2]], [[3]], [[4]]]
+    assert len(encoder.batches) == 1
+    assert batcher.stats()["batch_size_histogram"] == {"<=4": 1}
+
+
+def test_duplicate_texts_are_encoded_once():
+    encoder = RecordingEncoder()
+    batcher = EncodeBatcher(encoder, max_batch_size=3, max_wait_ms=5000)
+
+    vectors = encode_concurrently(batcher, ["same", "same", "other"])
+
+    assert sorted(encoder.batches[0]) == ["other", "same"]
+    assert [vector.tolist() for vector in vectors] == [[[4]], [[4]], [[5]]]
+
+
+def test_single_request_is_encoded_after_wait():
+    encoder = RecordingEncoder()
+    batcher = EncodeBatcher(encoder, max_batch_size=8, max_wait_ms=1)
+
+    assert batcher.encode("text").tolist() == [[4]]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["mean_batch_size"] == 1.0
+
+
+def test_encode_error_reaches_every_caller():
+    encoder = RecordingEncoder(error=RuntimeError("model failed"))
+    batcher = EncodeBatcher(encoder, max_batch_size=2, max_wait_ms=5000)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batcher.encode, text) for text in ["a", "b"]]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(5)
+    assert batcher.stats()["batches"] == 0
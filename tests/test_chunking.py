@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.services.chunking import ChunkingService, Passage  # noqa: E402
+
+TEXT = " ".join(f"word{i:03d}" for i in range(200))
+
+
+@pytest.fixture
+def chunking():
+    return ChunkingService(chunk_size=100, chunk_overlap=20)
+
+
+@pytest.mark.parametrize("text", ["", "   \n\t "])
+def test_blank_text_has_no_passages(chunking, text):
+    assert chunking.split(text) == []
+
+
+def test_short_text_is_one_passage(chunking):
+    assert chunking.split("short text") == [Passage(start=0, end=10)]
+
+
+def test_passages_cover_text_within_size(chunking):
+    passages = chunking.split(TEXT)
+
+    assert passages[0].start == 0
+    assert passages[-1].end == len(TEXT)
+    for passage in passages:
+        assert 0 < passage.end - passage.start <= chunking.chunk_size
+
+
+def test_passages_overlap_and_cut_at_words(chunking):
+    passages = chunking.split(TEXT)
+
+    for previous, passage in zip(passages, passages[1:]):
+        assert passage.start < previous.end
+        assert passage.start > previous.start
+        assert TEXT[passage.start - 1] == " "
+        assert TEXT[previous.end] == " "
+
+
+def test_text_without_spaces_is_cut_hard(chunking):
+    passages = chunking.split("x" * 250)
+
+    assert [passage.end for passage in passages][-1] == 250
+    assert all(passage.end - passage.start <= 100 for passage in passages)
+
+
+def test_overlap_is_at_most_half_the_size():
+    assert ChunkingService(chunk_size=100, chunk_overlap=80).chunk_overlap == 50
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from app.services.cluster_service import ClusterService  # noqa: E402
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+
+def model(num_clusters=3, fitted_documents=10, assigned_documents=0):
+    return SimpleNamespace(
+        num_clusters=num_clusters,
+        fitted_documents=fitted_documents,
+        assigned_documents=assigned_documents
+    )
+
+
+@pytest.fixture
+def service():
+    service = ClusterService(num_clusters=3)
+    service._fit_executor = RecordingExecutor()
+    return service
+
+
+def test_needs_fit(service):
+    assert service.needs_fit(None)
+    assert service.needs_fit(model(num_clusters=5))
+    assert service.needs_fit(model(assigned_documents=11))
+    assert not service.needs_fit(model(assigned_documents=10))
+
+
+def test_fit_is_queued_once_per_owner(service):
+    service.enqueue_fit(1)
+    service.enqueue_fit(1)
+    service.enqueue_fit(2)
+
+    assert [args for _, args in service._fit_executor.submitted] == [(1,), (2,)]
+
+
+def test_fit_can_be_queued_again_once_started(service, monkeypatch):
+    service.enqueue_fit(1)
+    # The background fit takes the owner off the queue before it runs
+    monkeypatch.setattr(
+        "app.services.cluster_service.SessionLocal",
+        lambda: SimpleNamespace(rollback=lambda: None, close=lambda: None)
+    )
+    monkeypatch.setattr(service, "needs_fit", lambda model: False)
+    monkeypatch.setattr(
+        "app.services.embedding_service.embedding_service.get_user_index",
+        lambda db, owner_id: None
+    )
+    monkeypatch.setattr(
+        "app.crud.cluster.crud_cluster.get_model",
+        lambda db, owner_id: None
+    )
+    service._fit_in_background(1)
+
+    service.enqueue_fit(1)
+
+    assert len(service._fit_executor.submitted) == 2
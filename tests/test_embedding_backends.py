@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.services import embedding_backends  # noqa: E402
+from app.services.embedding_backends import (  # noqa: E402
+    EmbeddingBackend,
+    OnnxBackend,
+    create_backend,
+)
+
+
+def installed(monkeypatch, modules, sentence_transformers):
+    monkeypatch.setattr(
+        embedding_backends.importlib.util,
+        "find_spec",
+        lambda name: object() if name in modules else None
+    )
+    monkeypatch.setattr(
+        embedding_backends,
+        "version",
+        lambda package: sentence_transformers
+    )
+
+
+def test_onnx_backend_needs_its_extra(monkeypatch):
+    installed(monkeypatch, {"onnxruntime"}, "2.2.2")
+
+    with pytest.raises(ValueError) as error:
+        create_backend("onnx", "model")
+
+    assert "optimum, sentence-transformers>=3.2" in str(error.value)
+    assert "knowledge-base[onnx]" in str(error.value)
+
+
+def test_onnx_backend_is_created_when_installed(monkeypatch):
+    installed(monkeypatch, {"onnxruntime", "optimum"}, "3.2.0rc1")
+
+    assert isinstance(create_backend("onnx", "model"), OnnxBackend)
+
+
+def test_torch_backend_has_no_extra_requirements(monkeypatch):
+    installed(monkeypatch, set(), "2.2.2")
+
+    assert type(create_backend("torch", "model")) is EmbeddingBackend
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+pytest.importorskip("sqlalchemy")
+
+from app.services import embedding_service as embedding_module  # noqa: E402
+from app.services.embedding_service import EmbeddingService  # noqa: E402
+from app.services.index_store import IndexStore  # noqa: E402
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = EmbeddingService()
+    service.index_store = IndexStore(str(tmp_path))
+    monkeypatch.setattr(
+        embedding_module.neighbor_service,
+        "rebuild",
+        lambda *args: None
+    )
+    return service
+
+
+def test_build_index_sorts_mapping_with_vectors(service):
+    # Chunks come back grouped by document, not ordered by chunk id
+    mapping = np.array([
+        [30, 3, 0, 10],
+        [10, 1, 0, 10],
+        [20, 2, 0, 10],
+        [5, 1, 10, 20]
+    ], dtype="int64")
+    embeddings = np.eye(4, 8, dtype="float32")
+    service._query_indexable_documents = lambda db, user_id: FakeQuery([object()])
+    service.get_chunk_embeddings = lambda *args, **kwargs: (mapping, embeddings)
+
+    user_index = service._build_index(db=None, user_id=1)
+
+    assert list(user_index.chunk_ids) == [5, 10, 20, 30]
+    for row, vector in zip(mapping, embeddings):
+        chunk_id, document_id = row[0], row[1]
+        assert user_index.lookup(chunk_id)[1] == document_id
+        _, labels = user_index.search(vector[None, :], 1)
+        assert labels[0, 0] == chunk_id
+
+
+def test_writable_copy_reads_snapshot_instead_of_cloning(service, monkeypatch):
+    mapping = np.array([[1, 1, 0, 10], [2, 1, 10, 20]], dtype="int64")
+    index, params = service.create_index(np.eye(2, 8, dtype="float32"), [1, 2])
+    user_index = service.save_index(
+        embedding_module.UserIndex(1, index, mapping, params)
+    )
+    served = service.load_index(1)
+
+    def clone_index(index):
+        raise RuntimeError("clone not supported")
+
+    monkeypatch.setattr("faiss.clone_index", clone_index)
+    writable = service._writable_copy(user_index)
+    writable.remove_ids(np.array([1], dtype="int64"))
+
+    assert writable.ntotal == 1
+    assert served.index.ntotal == 2
+
+
+def test_writable_copy_of_removed_snapshot(service):
+    mapping = np.array([[1, 1, 0, 10]], dtype="int64")
+    index, params = service.create_index(np.eye(1, 8, dtype="float32"), [1])
+    user_index = embedding_module.UserIndex(
+        1,
+        index,
+        mapping,
+        params,
+        version="v0000000009"
+    )
+
+    assert service._writable_copy(user_index) is None
+
+
+def test_stored_operations_are_restored_once_per_version(service, monkeypatch):
+    mapping = np.array([[1, 1, 0, 10]], dtype="int64")
+    index, params = service.create_index(np.eye(1, 8, dtype="float32"), [1])
+    service.save_index(embedding_module.UserIndex(1, index, mapping, params))
+    # Another worker finds operations a crashed worker left queued
+    worker = EmbeddingService()
+    worker.index_store = service.index_store
+    monkeypatch.setattr(
+        embedding_module.crud_index_operation,
+        "get_pending",
+        lambda db, user_id: {2: ("upsert", 3), 1: ("remove", 1)}
+    )
+    submitted = []
+    worker._submit = lambda fn, *args: submitted.append(args)
+    worker.flush_pending = lambda *args, **kwargs: None
+
+    worker.get_user_index(db=None, user_id=1)
+    worker.get_user_index(db=None, user_id=1)
+
+    assert worker._pending[1] == {2: "upsert", 1: "remove"}
+    assert submitted == [(1,)]
+
+
+def test_async_query_encoding_is_batched_and_cached(service):
+    encoded = []
+
+    def encode(texts):
+        encoded.append(texts)
+        return np.ones((len(texts), 8), dtype="float32")
+
+    service.query_batcher = embedding_module.EncodeBatcher(encode, 8, 1)
+
+    first = asyncio.run(service.encode_query_async("Hello  World"))
+    second = asyncio.run(service.encode_query_async("hello world"))
+
+    assert encoded == [["hello world"]]
+    assert first is second
+    assert first.shape == (1, 8)
+
+
+def test_create_embeddings_async_runs_on_inference_executor(service, monkeypatch):
+    threads = []
+
+    def create_embeddings(texts):
+        threads.append(threading.current_thread().name)
+        return np.zeros((len(texts), 8), dtype="float32")
+
+    monkeypatch.setattr(service, "create_embeddings", create_embeddings)
+
+    vectors = asyncio.run(service.create_embeddings_async(["a", "b"]))
+
+    assert vectors.shape == (2, 8)
+    assert threads[0].startswith("inference")
@@ -0,0 +1,70 @@
+from app.services.index_cache import IndexCache
+
+
+def test_get_counts_hits_and_misses():
+    cache = IndexCache(max_bytes=100)
+    cache.put(1, "index", 10)
+
+    assert cache.get(1) == "index"
+    assert cache.get(2) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_is_evicted():
+    cache = IndexCache(max_bytes=100)
+    cache.put(1, "first", 40)
+    cache.put(2, "second", 40)
+    cache.get(1)
+
+    cache.put(3, "third", 40)
+
+    assert cache.peek(1) == "first"
+    assert cache.peek(2) is None
+    assert cache.peek(3) == "third"
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes == 80
+
+
+def test_put_replaces_entry_of_user():
+    cache = IndexCache(max_bytes=100)
+    cache.put(1, "old", 60)
+
+    cache.put(1, "new", 70)
+
+    assert cache.peek(1) == "new"
+    assert cache.current_bytes == 70
+    assert cache.stats()["evictions"] == 0
+
+
+def test_oversized_index_is_not_cached():
+    cache = IndexCache(max_bytes=100)
+    cache.put(1, "old", 10)
+
+    cache.put(1, "huge", 101)
+
+    assert cache.peek(1) is None
+    assert cache.current_bytes == 0
+
+
+def test_peek_does_not_touch_recency_or_counters():
+    cache = IndexCache(max_bytes=100)
+    cache.put(1, "first", 50)
+    cache.put(2, "second", 50)
+
+    cache.peek(1)
+    cache.put(3, "third", 50)
+
+    assert cache.peek(1) is None
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+
+def test_invalidate_frees_budget():
+    cache = IndexCache(max_bytes=100)
+    cache.put(1, "index", 60)
+
+    cache.invalidate(1)
+    cache.invalidate(1)
+
+    assert cache.peek(1) is None
+    assert cache.current_bytes == 0
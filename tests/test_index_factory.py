@@ -0,0 +1,50 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from app.services.index_factory import (  # noqa: E402
+    FLAT,
+    HNSW,
+    IVFPQ,
+    IndexFactory,
+)
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 16)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_small_corpus_is_exact(vectors):
+    factory = IndexFactory(10000, 20000, 0.9)
+
+    index, params = factory.build(vectors, np.arange(1000, dtype="int64"))
+
+    assert params["type"] == FLAT
+    assert index.ntotal == 1000
+
+
+def test_unreachable_ivfpq_recall_falls_back_to_hnsw(vectors):
+    # PQ codes of random vectors cannot reach this recall at any nprobe
+    factory = IndexFactory(0, 0, 0.9)
+
+    index, params = factory.build(vectors, np.arange(1000, dtype="int64"))
+
+    assert params["type"] == HNSW
+    assert params["fallback_from"] == IVFPQ
+    assert params["recall"] >= 0.9
+    assert not factory.needs_rebuild(params, 1001)
+    assert factory.needs_rebuild(params, 0)
+
+
+def test_reachable_ivfpq_recall_keeps_ivfpq(vectors):
+    factory = IndexFactory(0, 0, 0.0)
+
+    _, params = factory.build(vectors, np.arange(1000, dtype="int64"))
+
+    assert params["type"] == IVFPQ
+    assert "fallback_from" not in params
+    assert not factory.needs_rebuild(params, 1001)
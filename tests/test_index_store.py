@@ -0,0 +1,142 @@
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+faiss = pytest.importorskip("faiss")
+
+from app.services.index_store import (  # noqa: E402
+    STAGING_MAX_AGE_SECONDS,
+    STAGING_PREFIX,
+    IndexStore,
+)
+
+
+def make_index(ids):
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(4))
+    vectors = np.eye(len(ids), 4, dtype="float32")
+    index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+    return index
+
+
+def make_mapping(ids):
+    return np.array([[chunk_id, 1, 0, 10] for chunk_id in ids], dtype="int64")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return IndexStore(str(tmp_path), keep_versions=2)
+
+
+def test_open_without_snapshot(store):
+    assert store.open(1) is None
+
+
+def test_publish_and_open_round_trip(store):
+    tombstones = np.array([7], dtype="int64")
+
+    version = store.publish(
+        1,
+        make_index([3, 7]),
+        make_mapping([3]),
+        {"model": "test"},
+        tombstones
+    )
+    opened_version, index, mapping, opened_tombstones, metadata = store.open(1)
+
+    assert opened_version == version == store.current_version(1)
+    assert index.ntotal == 2
+    np.testing.assert_array_equal(mapping, make_mapping([3]))
+    np.testing.assert_array_equal(opened_tombstones, tombstones)
+    assert metadata["model"] == "test"
+
+
+def test_publish_moves_current_to_new_version(store):
+    first = store.publish(1, make_index([1]), make_mapping([1]), {})
+    second = store.publish(1, make_index([1, 2]), make_mapping([1, 2]), {})
+
+    assert second > first
+    assert store.open(1)[0] == second
+    assert store.open(1)[1].ntotal == 2
+
+
+def test_open_empty_mapping(store):
+    store.publish(1, make_index([]), make_mapping([]), {})
+
+    _, _, mapping, tombstones, _ = store.open(1)
+
+    assert mapping.shape == (0, 4)
+    assert len(tombstones) == 0
+
+
+def test_collect_garbage_keeps_newest_and_held(store):
+    versions = [
+        store.publish(1, make_index([i]), make_mapping([i]), {})
+        for i in range(1, 5)
+    ]
+
+    store.collect_garbage(1, held=[versions[0]])
+
+    remaining = sorted(
+        name for name in os.listdir(store.user_dir(1)) if name.startswith("v")
+    )
+    assert remaining == [versions[0], versions[2], versions[3]]
+
+
+def test_collect_garbage_removes_stale_staging(store):
+    store.publish(1, make_index([1]), make_mapping([1]), {})
+    stale = os.path.join(store.user_dir(1), f"{STAGING_PREFIX}stale")
+    fresh = os.path.join(store.user_dir(1), f"{STAGING_PREFIX}fresh")
+    os.mkdir(stale)
+    os.mkdir(fresh)
+    old = time.time() - STAGING_MAX_AGE_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    store.collect_garbage(1)
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+
+
+def test_unpublish_hides_snapshot(store):
+    store.publish(1, make_index([1]), make_mapping([1]), {})
+
+    store.unpublish(1)
+
+    assert store.open(1) is None
+
+
+
+def test_read_writable_is_independent_of_open_index(store):
+    version = store.publish(1, make_index([1, 2]), make_mapping([1, 2]), {})
+    _, served, _, _, _ = store.open(1)
+
+    writable = store.read_writable(1, version)
+    writable.remove_ids(np.array([1], dtype="int64"))
+
+    assert writable.ntotal == 1
+    assert served.ntotal == 2
+
+
+def test_read_writable_of_removed_version(store):
+    with pytest.raises(FileNotFoundError):
+        store.read_writable(1, "v0000000001")
+
+
+def test_read_writable_of_ivfpq_snapshot(store):
+    # Inverted lists of a mapped IVF index cannot be cloned or modified
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((512, 8)).astype("float32")
+    ids = np.arange(512, dtype="int64")
+    index = faiss.index_factory(8, "IVF4,PQ2", faiss.METRIC_INNER_PRODUCT)
+    index.train(vectors)
+    index.add_with_ids(vectors, ids)
+    version = store.publish(1, index, make_mapping(ids), {})
+
+    writable = store.read_writable(1, version)
+    writable.remove_ids(ids[:10])
+    writable.add_with_ids(vectors[:2], np.array([600, 601], dtype="int64"))
+
+    assert writable.ntotal == 504
+    assert store.open(1)[1].ntotal == 512
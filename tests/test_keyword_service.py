@@ -0,0 +1,122 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("sklearn")
+pytest.importorskip("sqlalchemy")
+
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+
+from app.services import keyword_service as keyword_module  # noqa: E402
+from app.services.keyword_service import STOP_WORDS, KeywordService  # noqa: E402
+
+CORPUS = [
+    "Vector search finds similar documents by their embeddings",
+    "Keyword search ranks documents by rare terms",
+    "The index of embeddings is rebuilt in the background",
+]
+
+
+class FakeModelStore:
+    """Keyword model state of one owner counted over a corpus"""
+
+    def __init__(self, service, corpus):
+        self.model = None
+        self.frequencies = Counter()
+        if corpus:
+            self.model = SimpleNamespace(document_count=len(corpus))
+            for text in corpus:
+                self.frequencies.update(set(service.analyze(text)))
+
+    def get_model(self, db, owner_id):
+        return self.model
+
+    def get_document_counts(self, db, owner_id, terms):
+        return {
+            term: self.frequencies[term]
+            for term in terms
+            if term in self.frequencies
+        }
+
+
+@pytest.fixture
+def service():
+    service = KeywordService()
+    yield service
+    service._update_executor.shutdown(wait=True)
+
+
+def test_scores_match_tfidf_vectorizer(service, monkeypatch):
+    monkeypatch.setattr(
+        keyword_module,
+        "crud_keyword_model",
+        FakeModelStore(service, CORPUS)
+    )
+    vectorizer = TfidfVectorizer(stop_words=STOP_WORDS, ngram_range=(1, 2))
+    matrix = vectorizer.fit_transform(CORPUS).toarray()
+    terms = vectorizer.get_feature_names_out()
+
+    results = service.score_batch(None, 1, CORPUS, num_keywords=100)
+
+    for row, keywords in zip(matrix, results):
+        expected = {terms[i]: row[i] for i in np.flatnonzero(row)}
+        assert dict(keywords) == pytest.approx(expected)
+        scores = [score for _, score in keywords]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_num_keywords_limits_results(service, monkeypatch):
+    monkeypatch.setattr(
+        keyword_module,
+        "crud_keyword_model",
+        FakeModelStore(service, CORPUS)
+    )
+
+    results = service.score_batch(None, 1, CORPUS, num_keywords=3)
+
+    assert [len(keywords) for keywords in results] == [3, 3, 3]
+
+
+def test_texts_without_terms_have_no_keywords(service, monkeypatch):
+    monkeypatch.setattr(
+        keyword_module,
+        "crud_keyword_model",
+        FakeModelStore(service, CORPUS)
+    )
+
+    assert service.score_batch(None, 1, ["", "the and"]) == [[], []]
+
+
+def test_missing_model_scores_by_frequency_and_fits(service, monkeypatch):
+    monkeypatch.setattr(
+        keyword_module,
+        "crud_keyword_model",
+        FakeModelStore(service, [])
+    )
+    fitted = []
+    monkeypatch.setattr(service, "_fit_in_background", fitted.append)
+
+    [keywords] = service.score_batch(None, 7, ["search search index"])
+
+    service._update_executor.shutdown(wait=True)
+    assert fitted == [7]
+    assert keywords[0][0] == "search"
+    assert keywords[0][1] > keywords[1][1]
+
+
+def test_missing_model_finds_nothing_and_fits(service, monkeypatch):
+    monkeypatch.setattr(
+        keyword_module,
+        "crud_keyword_model",
+        FakeModelStore(service, [])
+    )
+    fitted = []
+    monkeypatch.setattr(service, "_fit_in_background", fitted.append)
+
+    assert service.find_similar(None, 7, document_id=1) == []
+
+    service._update_executor.shutdown(wait=True)
+    assert fitted == [7]
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import Column, DateTime, Integer, create_engine  # noqa: E402
+from sqlalchemy.orm import declarative_base, sessionmaker  # noqa: E402
+
+from app.core.pagination import (  # noqa: E402
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keys_signature,
+    paginate,
+)
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2024, 1, 1)
+    # Pairs of items share a timestamp so the id breaks ties
+    session.add_all([
+        Item(id=i, created_at=start + timedelta(hours=i // 2))
+        for i in range(1, 11)
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 17, 12, 30, 1, 250), 42, "title"]
+
+    cursor = encode_cursor(values, "keys")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "keys") == values
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", "W3siZHQiOjF9XQ"])
+def test_decode_rejects_foreign_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "keys")
+
+
+def test_decode_rejects_cursor_of_other_signature():
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1], "keys"), "other")
+
+
+def test_paginate_walks_all_rows_once(db):
+    keys = [Item.created_at, Item.id]
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(db.query(Item), keys, cursor, limit=3)
+        seen.extend(item.id for item in page)
+        if cursor is None:
+            break
+
+    assert seen == list(range(10, 0, -1))
+
+
+def test_paginate_ignores_rows_added_before_cursor(db):
+    keys = [Item.created_at, Item.id]
+    first, cursor = paginate(db.query(Item), keys, None, limit=4)
+
+    db.add(Item(id=11, created_at=datetime(2030, 1, 1)))
+    db.commit()
+    second, _ = paginate(db.query(Item), keys, cursor, limit=4)
+
+    assert [item.id for item in first] == [10, 9, 8, 7]
+    assert [item.id for item in second] == [6, 5, 4, 3]
+
+
+def test_paginate_last_page_has_no_cursor(db):
+    page, cursor = paginate(db.query(Item), [Item.id], None, limit=10)
+
+    assert len(page) == 10
+    assert cursor is None
+
+
+def test_paginate_rejects_cursor_of_other_keys(db):
+    cursor = encode_cursor([5], keys_signature([Item.id]))
+
+    with pytest.raises(InvalidCursor):
+        paginate(db.query(Item), [Item.created_at, Item.id], cursor, limit=3)
+
+
+def test_paginate_rejects_cursor_replayed_on_other_listing(db):
+    # Same number of keys, but a timestamp where an integer is expected
+    _, cursor = paginate(db.query(Item), [Item.created_at, Item.id], None, limit=3)
+
+    with pytest.raises(InvalidCursor):
+        paginate(db.query(Item), [Item.id, Item.id], cursor, limit=3)
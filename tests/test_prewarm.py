@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.services import prewarm  # noqa: E402
+from app.services.prewarm import ModelPrewarmer  # noqa: E402
+
+
+def failing():
+    raise RuntimeError("model not found")
+
+
+@pytest.fixture
+def prewarmer(monkeypatch):
+    monkeypatch.setattr(
+        prewarm,
+        "WARMERS",
+        {"embedding": lambda: None, "summarizer": lambda: None}
+    )
+    return ModelPrewarmer(["embedding", "summarizer"])
+
+
+def test_warming_until_all_models_loaded(prewarmer):
+    prewarmer._warm("embedding")
+
+    assert not prewarmer.ready
+    assert prewarmer.report()["status"] == "warming"
+
+    prewarmer._warm("summarizer")
+
+    assert prewarmer.ready
+    assert prewarmer.report()["status"] == "ready"
+
+
+def test_failed_summarizer_is_tolerated(prewarmer, monkeypatch):
+    monkeypatch.setitem(prewarm.WARMERS, "summarizer", failing)
+
+    prewarmer._warm("embedding")
+    prewarmer._warm("summarizer")
+
+    assert prewarmer.ready
+    assert prewarmer.report()["errors"] == {"summarizer": "model not found"}
+
+
+def test_failed_embedding_model_is_not_ready(prewarmer, monkeypatch):
+    monkeypatch.setitem(prewarm.WARMERS, "embedding", failing)
+
+    prewarmer._warm("embedding")
+
+    assert not prewarmer.ready
+    assert prewarmer.report()["status"] == "failed"
+
+    prewarmer._warm("summarizer")
+
+    assert not prewarmer.ready
+    assert prewarmer.report()["status"] == "failed"
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services import query_cache as query_cache_module  # noqa: E402
+from app.services.query_cache import QueryCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_get_returns_stored_vector(clock):
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    vector = np.ones((1, 4), dtype="float32")
+    cache.put(("model", "query"), vector)
+
+    assert cache.get(("model", "query")) is vector
+    assert cache.get(("model", "other")) is None
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    cache.put("query", np.ones(4))
+
+    clock.now += 61
+
+    assert cache.get("query") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["expirations"], stats["misses"]) == (0, 1, 1)
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    cache.put("first", np.ones(4))
+    cache.put("second", np.ones(4))
+    cache.get("first")
+
+    cache.put("third", np.ones(4))
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_put_refreshes_expiry(clock):
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    cache.put("query", np.ones(4))
+    clock.now += 50
+
+    cache.put("query", np.zeros(4))
+    clock.now += 50
+
+    assert cache.get("query").tolist() == [0, 0, 0, 0]
+
+
+def test_disabled_cache_stores_nothing(clock):
+    cache = QueryCache(max_entries=0, ttl_seconds=60)
+    cache.put("query", np.ones(4))
+
+    assert cache.get("query") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_vector_is_read_only(clock):
+    cache = QueryCache(max_entries=2, ttl_seconds=60)
+    cache.put("query", np.ones(4, dtype="float32"))
+
+    with pytest.raises(ValueError):
+        cache.get("query")[0] = 0
@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def start_blocked_call(flight, key, result=None, error=None):
+    """Run a call for key in a thread, blocked until the event is set"""
+    started, release = threading.Event(), threading.Event()
+
+    def function():
+        started.set()
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(flight.run, key, function)
+    assert started.wait(5)
+    executor.shutdown(wait=False)
+    return future, release
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    owner, release = start_blocked_call(flight, "key", result=42)
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        waiters = [
+            executor.submit(flight.run, "key", lambda: calls.append(1))
+            for _ in range(4)
+        ]
+        wait_until(lambda: flight.stats()["coalesced"] == 4)
+        release.set()
+
+        assert owner.result(5) == 42
+        assert [waiter.result(5) for waiter in waiters] == [42] * 4
+    assert calls == []
+    assert flight.stats() == {"in_flight": 0, "coalesced": 4}
+
+
+def test_waiters_get_exception_of_call():
+    flight = SingleFlight()
+    owner, release = start_blocked_call(flight, "key", error=ValueError("boom"))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        waiter = executor.submit(flight.run, "key", lambda: None)
+        wait_until(lambda: flight.stats()["coalesced"] == 1)
+        release.set()
+
+        with pytest.raises(ValueError):
+            owner.result(5)
+        with pytest.raises(ValueError):
+            waiter.result(5)
+    assert not flight.in_flight("key")
+
+
+def test_waiter_times_out_while_call_runs():
+    flight = SingleFlight()
+    owner, release = start_blocked_call(flight, "key", result=1)
+
+    with pytest.raises(FutureTimeoutError):
+        flight.run("key", lambda: 2, timeout=0.05)
+
+    release.set()
+    assert owner.result(5) == 1
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    owner, release = start_blocked_call(flight, "first", result=1)
+
+    assert flight.in_flight("first")
+    assert flight.run("second", lambda: 2) == 2
+    release.set()
+    assert owner.result(5) == 1
+
+
+def test_next_call_runs_again_after_finish():
+    flight = SingleFlight()
+
+    assert flight.run("key", lambda: 1) == 1
+    assert flight.run("key", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0